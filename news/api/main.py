@@ -1,14 +1,18 @@
+import asyncio
+import hashlib
 import time
-from fastapi import FastAPI, HTTPException, Response
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
 from apscheduler.schedulers.background import BackgroundScheduler
 from contextlib import asynccontextmanager
+from collections import OrderedDict
 from enum import Enum
 from typing import Optional
 from dotenv import load_dotenv
 import os
+import socket
 from datetime import datetime, timedelta
 
 from news.tracker.news_tracker import NewsTracker
@@ -17,18 +21,25 @@ from news.storage.repository import (
     get_news_by_topic,
     mark_read,
     delete_news,
-    get_all_news,
-    update_news_sentiment,
+    db_version,
+    get_all_news_raw,
+    get_pending_sentiment,
+    drain_pending_sentiment,
+    update_news_sentiment_bulk,
 )
 from news.classifier.news_classifier import NewsClassifier
 from news.summarizer.news_summarizer import NewsSummarizer
 from news.notifier.news_notifier import Notifier
+from news.utils.log_utils import get_logger
+
+logger = get_logger(__name__)
 
 
 REFRESH_INTERVAL_MINUTES = 5          # intervalo de fetch de notícias (min)
 CLASSIFY_INTERVAL_MINUTES = 15         # intervalo de classificação de sentimento (min)
 EMAIL_SENDING_INTERVAL_MINUTES = 30     # janela de envio (minutes) usada no job de e-mail
 EMAIL_SINCE_PUBLISHED_HOURS = 2  # janela de envio de e-mail (horas) para itens FRESH
+NEWS_CACHE_MAX_AGE = 60  # cache de cliente (s) para /news/{topic}/*, revalidado por ETag
 
 THEME_REGION_DEFAULT = [
     # Main Themes
@@ -80,7 +91,7 @@ summarizer = NewsSummarizer()
 tracker = NewsTracker()
 
 # Notifier com defaults do .env e usando o repositório de notícias
-notifier = Notifier.from_env(get_all_news)
+notifier = Notifier.from_env(get_all_news_raw)
 
 tracker.last_updated = int(time.time())
 session_start_time = tracker.last_updated
@@ -98,56 +109,106 @@ scheduler = BackgroundScheduler(
     }
 )
 
+# Com vários workers uvicorn cada processo executa o lifespan; só um deve rodar os
+# jobs (senão cada worker duplica fetch/classificação). O "lock" é uma porta local:
+# o primeiro processo que consegue o bind fica com o scheduler. RUN_SCHEDULER=0
+# desliga o scheduler nesta instância (ex.: jobs rodando em um serviço separado).
+SCHEDULER_LOCK_PORT = int(os.getenv("SCHEDULER_LOCK_PORT", "48761"))
+_scheduler_lock: Optional[socket.socket] = None
+
+def _claim_scheduler() -> bool:
+    global _scheduler_lock
+    if os.getenv("RUN_SCHEDULER", "1") == "0":
+        return False
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.bind(("127.0.0.1", SCHEDULER_LOCK_PORT))
+    except OSError:
+        sock.close()
+        return False
+    _scheduler_lock = sock
+    return True
+
+def _release_scheduler():
+    global _scheduler_lock
+    if _scheduler_lock is not None:
+        _scheduler_lock.close()
+        _scheduler_lock = None
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Agenda os jobs
-    scheduler.add_job(update_and_save_all, "interval", minutes=REFRESH_INTERVAL_MINUTES, id="fetch_news")
-    scheduler.add_job(classify_pending_news, "interval", minutes=CLASSIFY_INTERVAL_MINUTES, id="classify_sentiment")
-    scheduler.add_job(lambda: send_fresh_email_job(window_hours=EMAIL_SINCE_PUBLISHED_HOURS), "interval", minutes=EMAIL_SENDING_INTERVAL_MINUTES, id=f"notify_outlook_{EMAIL_SENDING_INTERVAL_MINUTES}min")
-    scheduler.start()
+    owns_scheduler = _claim_scheduler()
+    if not owns_scheduler:
+        logger.info("Scheduler ativo em outro processo (pid %d só atende requisições).", os.getpid())
+    else:
+        # Agenda os jobs
+        scheduler.add_job(update_and_save_all, "interval", minutes=REFRESH_INTERVAL_MINUTES, id="fetch_news")
+        scheduler.add_job(classify_pending_news, "interval", minutes=CLASSIFY_INTERVAL_MINUTES, id="classify_sentiment")
+        # varredura completa: uma vez no startup (pendentes de sessões anteriores) e toda madrugada
+        scheduler.add_job(classify_pending_news, kwargs={"full_scan": True}, id="classify_backlog_startup")
+        scheduler.add_job(classify_pending_news, "cron", hour=3, kwargs={"full_scan": True}, id="classify_backlog_nightly")
+        scheduler.add_job(lambda: send_fresh_email_job(window_hours=EMAIL_SINCE_PUBLISHED_HOURS), "interval", minutes=EMAIL_SENDING_INTERVAL_MINUTES, id=f"notify_outlook_{EMAIL_SENDING_INTERVAL_MINUTES}min")
+        scheduler.start()
+
+        # Primeira execução imediata para aquecer dados
+        try:
+            # asyncio.run não pode rodar dentro do loop do lifespan -> thread
+            await asyncio.to_thread(update_and_save_all)
+        except Exception as e:
+            logger.warning("first update failed: %s", e)
 
-    # Primeira execução imediata para aquecer dados
     try:
-        update_and_save_all()
-    except Exception as e:
-        print(f"[WARN] first update failed: {e}")
-
-    yield
-    scheduler.shutdown(wait=False)
+        yield
+    finally:
+        if owns_scheduler:
+            scheduler.shutdown(wait=False)
+            _release_scheduler()
+        # todo worker encerra o tracker (pools/clientes), tenha ou não ficado com o scheduler
+        tracker.close()
 
 
 def update_and_save_all():
-    tracker.update_all()
-    for topic in tracker.feeds:
+    # Fan-out async dos feeds; roda fora do event loop (scheduler/threadpool)
+    asyncio.run(tracker.update_all_async())
+    # cópia: /add-topic e /remove-topic podem mexer no dict durante o job
+    for topic in list(tracker.feeds):
         fresh = tracker.get_last_news(topic)
         if fresh:
             add_news_batch(fresh, topic, session_start_time)
     tracker.last_updated = int(time.time())
-    print('[INFO] All news updated and saved.')
+    logger.info("All news updated and saved.")
     return {"status": "success"}
 
 
-def classify_pending_news():
+def classify_pending_news(chunk_size: int = 200, full_scan: bool = False):
     """
-    Verifica no repositório se há notícias sem sentimento e executa classificação.
+    Classifica as notícias sem sentimento, em blocos de `chunk_size` gravados em
+    uma única escrita cada. Por padrão consome só a fila de itens recém-inseridos
+    (trabalho proporcional à entrada); `full_scan=True` varre o repositório, como
+    rede de segurança no startup e uma vez por noite.
     """
-    print("Checking and Updating News Classification")
-    db_items = get_all_news()
-    pending = [(item.link or item.title, item.title) for item in db_items if getattr(item, "sentiment", None) is None]
+    logger.info("Checking and Updating News Classification")
+    next_chunk = get_pending_sentiment if full_scan else drain_pending_sentiment
+    total = 0
+    while True:
+        pending = next_chunk(chunk_size)
+        if not pending:
+            break
+
+        keys, texts = zip(*pending)
+        results = classifier.classify_texts(list(texts))
+        updated = update_news_sentiment_bulk(
+            (key, res["sentiment"], res["probabilities"]) for key, res in zip(keys, results)
+        )
+        total += updated
+        # varredura: bloco incompleto = fim; nada atualizado = evita laço infinito
+        if full_scan and (len(pending) < chunk_size or not updated):
+            break
 
-    total = len(pending)
     if total == 0:
-        print("No pending items found.")
+        logger.info("No pending items found.")
         return
-
-    print(f"Found {total} pending items for classification.")
-    keys, texts = zip(*pending)
-
-    results = classifier.classify_texts(list(texts))
-    for key, res in zip(keys, results):
-        update_news_sentiment(key, res["sentiment"], res["probabilities"])
-
-    print("Classification Finished!")
+    logger.info("Classification Finished! (%d items)", total)
 
 
 def send_fresh_email_job(window_hours: int):
@@ -158,26 +219,33 @@ def send_fresh_email_job(window_hours: int):
     # Verifica destinatário padrão (do Notifier ou do .env)
     to = notifier.default_to or DEFAULT_TO
     if not to:
-        print("[notify] SEND_TO não definido no .env — pulando envio.")
+        logger.info("[notify] SEND_TO não definido no .env — pulando envio.")
         return
 
     items = notifier.collect_fresh_news(hours=window_hours)
     if not items:
-        print("[notify] Sem itens FRESH na janela — nada a enviar.")
+        logger.info("[notify] Sem itens FRESH na janela — nada a enviar.")
         return
 
     subject = f"[NewsTracker] {len(items)} FRESH nas últimas {window_hours}h"
     html = notifier.render_email_html(items)
     try:
         notifier.send_via_outlook(to=to, subject=subject, html_body=html)
-        print(f"[notify] Enviado para {to} ({len(items)} itens)")
+        logger.info("[notify] Enviado para %s (%d itens)", to, len(items))
     except Exception as e:
-        print(f"[notify] Falha no envio via Outlook: {e}")
+        logger.error("[notify] Falha no envio via Outlook: %s", e)
 
 #%% APP
 
 app = FastAPI(lifespan=lifespan)
 
+def _refresh_topics():
+    # Snapshot imutável dos tópicos para as rotas de leitura; trocado (não mutado)
+    # a cada add/remove, então a checagem por requisição nunca vê o dict mudando.
+    app.state.topics = frozenset(tracker.feeds)
+
+_refresh_topics()
+
 # Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -189,63 +257,101 @@ app.add_middleware(
 # Compressão gzip para reduzir payloads de /news/* e /topics
 app.add_middleware(GZipMiddleware, minimum_size=512)
 
+# Cache LRU do JSON (bytes) de cada item: o mesmo item volta em toda requisição
+# até mudar de status/sentimento, que fazem parte da chave (não precisa invalidar).
+_DUMP_CACHE: "OrderedDict[tuple, bytes]" = OrderedDict()
+_DUMP_CACHE_MAX = 5000
+_ENVELOPE_HEAD = b'{"status":"success","data":['
+_ENVELOPE_TAIL = b"]}"
+_RAW_JSON_FIELDS = {"probabilities"}
+
+def _dump_item(n) -> bytes:
+    key = (n.link, n.fetched_at, n.status, n.sentiment)
+    d = _DUMP_CACHE.get(key)
+    if d is None:
+        # model_dump_json serializa direto no pydantic-core, sem dict intermediário;
+        # probabilities já é JSON (texto do banco) e entra como está, no fim do objeto
+        head = n.model_dump_json(exclude=_RAW_JSON_FIELDS).encode("utf-8")
+        probs = n.probabilities.encode("utf-8") if n.probabilities else b"null"
+        d = head[:-1] + b',"probabilities":' + probs + b"}"
+        _DUMP_CACHE[key] = d
+        if len(_DUMP_CACHE) > _DUMP_CACHE_MAX:
+            _DUMP_CACHE.popitem(last=False)
+    else:
+        _DUMP_CACHE.move_to_end(key)
+    return d
+
+def _news_etag(topic: str, status_filter: Optional[str]) -> str:
+    # ETag fraco: hash de (tópico, filtro, último fetch, versão do repositório, minuto atual)
+    key = f"{topic}|{status_filter}|{tracker.last_updated}|{db_version()}|{int(time.time()) // 60}"
+    return f'W/"{hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()}"'
+
+def _json(obj) -> Response:
+    # orjson direto para bytes num Response simples (sem jsonable_encoder nem classe de resposta custom)
+    return Response(content=orjson.dumps(obj), media_type="application/json")
+
+def _envelope(items) -> Response:
+    # {"status": "success", "data": [...]} montado com os bytes já serializados de cada item;
+    # devolver um Response evita o jsonable_encoder do FastAPI.
+    body = _ENVELOPE_HEAD + b",".join(_dump_item(n) for n in items) + _ENVELOPE_TAIL
+    return Response(content=body, media_type="application/json")
+
 @app.get("/health")
-def health():
-    return {"status": "ok", "ts": int(time.time())}
+async def health():
+    return _json({"status": "ok", "ts": int(time.time())})
 
 @app.get("/topics")
-def get_topics():
-    return {"status": "success", "data": list(tracker.feeds.keys())}
+async def get_topics():
+    return _json({"status": "success", "data": list(tracker.feeds.keys())})
 
 @app.get("/last-update")
-def last_update():
+async def last_update():
     # (Opcional) cabeçalho de cache curto para aliviar o navegador
-    resp = JSONResponse({"status": "success", "last_update": tracker.last_updated})
+    resp = _json({"status": "success", "last_update": tracker.last_updated})
     resp.headers["Cache-Control"] = "public, max-age=5"
     return resp
 
-@app.get("/news/{topic}/fresh")
-def news_fresh(topic: str):
-    if topic not in tracker.feeds:
+async def _topic_news(request: Request, topic: str, status_filter: Optional[str] = None) -> Response:
+    if topic not in app.state.topics:
         raise HTTPException(404, "Tópico não rastreado")
-    items = get_news_by_topic(topic, status_filter="fresh")
-    resp = {"status": "success", "data": [n.model_dump() for n in items]}
+    # Conteúdo só muda com novo fetch, escrita no repositório ou virada de status (minuto).
+    # db_version() pega o db_lock: fora do event loop, para um job gravando no banco
+    # (add_news_batch, sentimento em lote) não travar as rotas async
+    etag = await asyncio.to_thread(_news_etag, topic, status_filter)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={NEWS_CACHE_MAX_AGE}"}
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=304, headers=headers)
+    items = await asyncio.to_thread(get_news_by_topic, topic, status_filter=status_filter)
+    resp = _envelope(items)
+    resp.headers.update(headers)
     return resp
 
+@app.get("/news/{topic}/fresh")
+async def news_fresh(topic: str, request: Request):
+    return await _topic_news(request, topic, "fresh")
+
 @app.get("/news/{topic}/new")
-def news_new(topic: str):
-    if topic not in tracker.feeds:
-        raise HTTPException(404, "Tópico não rastreado")
-    items = get_news_by_topic(topic, status_filter="new")
-    resp = {"status": "success", "data": [n.model_dump() for n in items]}
-    return resp
+async def news_new(topic: str, request: Request):
+    return await _topic_news(request, topic, "new")
 
 @app.get("/news/{topic}/old")
-def news_old(topic: str):
-    if topic not in tracker.feeds:
-        raise HTTPException(404, "Tópico não rastreado")
-    items = get_news_by_topic(topic, status_filter="old")
-    resp = {"status": "success", "data": [n.model_dump() for n in items]}
-    return resp
+async def news_old(topic: str, request: Request):
+    return await _topic_news(request, topic, "old")
 
 @app.get("/news/{topic}/all")
-def news_all(topic: str):
-    if topic not in tracker.feeds:
-        raise HTTPException(404, "Tópico não rastreado")
-    items = get_news_by_topic(topic)
-    resp = {"status": "success", "data": [n.model_dump() for n in items]}
-    return resp
+async def news_all(topic: str, request: Request):
+    return await _topic_news(request, topic)
 
 # POST
 @app.post("/force-update")
 def force_update():
-    return update_and_save_all()
+    return _json(update_and_save_all())
 
 @app.post("/news/read")
 def api_mark_read(link: str):
     if not mark_read(link):
         raise HTTPException(404, "Link não encontrado")
-    return {"status": "success"}
+    return _json({"status": "success"})
 
 @app.post("/add-topic")
 def add_topic(topic: str, region: Region = Region.us):
@@ -253,42 +359,51 @@ def add_topic(topic: str, region: Region = Region.us):
     Adiciona um novo tópico ao tracker.
     """
     if topic in tracker.feeds:
-        return {"status": "exists", "region": region.value}
+        return _json({"status": "exists", "region": region.value})
     tracker.add_topic(topic, max_items=20, verify=False, region=region.value)
-    return {"status": "success", "region": region.value}
+    _refresh_topics()
+    return _json({"status": "success", "region": region.value})
 
 @app.post("/notify/outlook")
 def notify_outlook(hours: int = 2, to: Optional[str] = None):
     r = notifier.notify_outlook(hours=hours, to=to)
     if r.get("status") == "error":
         raise HTTPException(400, r["error"])
-    return r
+    return _json(r)
 
 @app.post("/notify/teams")
 def notify_teams(hours: int = 2, webhook_url: Optional[str] = None):
     r = notifier.notify_teams(hours=hours, webhook_url=webhook_url)
     if r.get("status") == "error":
         raise HTTPException(400, r["error"])
-    return r
+    return _json(r)
 
 # DELETE
 @app.delete("/news/delete")
 def api_delete_news(link: str):
     if not delete_news(link):
         raise HTTPException(404, "Link não encontrado")
-    return {"status": "success"}
+    return _json({"status": "success"})
 
 @app.delete("/remove-topic")
 def remove_topic(topic: str):
-    if topic not in tracker.feeds:
+    # limpeza completa (feeds, índices e, com Redis, chaves de dedup)
+    if not tracker.remove_topic(topic):
         raise HTTPException(404, "Tópico não encontrado")
-    # limpeza defensiva
-    del tracker.feeds[topic]
-    del tracker.all_news[topic]
-    del tracker.seen_links[topic]
-    del tracker.last_fetched[topic]
-    return {"status": "success"}
+    _refresh_topics()
+    return _json({"status": "success"})
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("news.api.main:app", host="0.0.0.0", port=8000, reload=True)
+    # uvloop + httptools (pip install "uvicorn[standard]"); API_WORKERS>1 usa vários núcleos,
+    # mas tópicos adicionados via /add-topic ficam só no worker que recebeu a chamada.
+    workers = int(os.getenv("API_WORKERS", "1"))
+    uvicorn.run(
+        "news.api.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if os.name == "nt" else "uvloop",  # uvloop não suporta Windows
+        http="httptools",
+        workers=workers,
+        reload=False,
+    )
@@ -2,11 +2,13 @@
 import os
 import requests
 from huggingface_hub import configure_http_backend
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
 import uuid
+from threading import Lock
 import json
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict, Optional
+
+if TYPE_CHECKING:
+    import torch
 
 # --- 1. Configurar cache customizado (opcional) ---
 os.environ.setdefault("HF_HOME", os.path.expanduser("~/.cache/huggingface_hub"))
@@ -20,6 +22,32 @@ def backend_factory() -> requests.Session:
 configure_http_backend(backend_factory=backend_factory)
 # Explica: todas chamadas de download via Hugging Face Hub usarão esta sessão com verify=False :contentReference[oaicite:0]{index=0}
 
+# torch/transformers ficam para load()/classify_texts: o import deste módulo (feito pela
+# API e pelos testes) não carrega o PyTorch.
+BATCH_SIZE = 32  # títulos por forward pass (limita pico de memória)
+
+# --- 3. Modelo int8 via ONNX Runtime (opcional, CPU) ---
+# Export único:  optimum-cli export onnx --model tabularisai/multilingual-sentiment-analysis onnx/
+# Quantização:   quantize_onnx("onnx/model.onnx", "onnx/model.int8.onnx")
+# Depois aponte SENTIMENT_ONNX_PATH para o .int8.onnx (o tokenizer continua vindo de model_name).
+ONNX_PATH = os.getenv("SENTIMENT_ONNX_PATH")
+# torch.compile (PyTorch 2+) no carregamento; opt-in porque a primeira compilação é lenta
+TORCH_COMPILE = os.getenv("SENTIMENT_TORCH_COMPILE", "0") == "1"
+
+
+def quantize_onnx(onnx_path: str, out_path: str) -> str:
+    """Quantização dinâmica int8 (pesos das camadas Linear) de um modelo ONNX exportado."""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    quantize_dynamic(onnx_path, out_path, weight_type=QuantType.QInt8)
+    return out_path
+
+
+def _ort_session(onnx_path: str):
+    import onnxruntime as ort
+    opts = ort.SessionOptions()
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(onnx_path, sess_options=opts, providers=["CPUExecutionProvider"])
+
 class NewsClassifier:
     """
     Classe para classificar sentimentos de textos/títulos de notícia.
@@ -27,17 +55,82 @@ class NewsClassifier:
     Muito Negativo, Negativo, Neutro, Positivo, Muito Positivo.
     """
 
-    def __init__(self, model_name: str = "tabularisai/multilingual-sentiment-analysis"):
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    def __init__(self, model_name: str = "tabularisai/multilingual-sentiment-analysis",
+                 onnx_path: Optional[str] = ONNX_PATH, compile_model: bool = TORCH_COMPILE):
+        # Nada é carregado aqui: o modelo só sobe no primeiro classify_texts (ou em load()),
+        # ou seja, apenas no processo que roda o job de classificação, e não no import da API.
+        self.model_name = model_name
+        self.onnx_path = onnx_path
+        self.compile_model = compile_model
+        self.tokenizer = None
+        self.session = None
+        self.model = None
+        self.device = "cpu"
+        self._load_lock = Lock()
         self.labels = ["Muito Negativo", "Negativo", "Neutro", "Positivo", "Muito Positivo"]
 
-    def classify_texts(self, texts: List[str]) -> List[Dict]:
-        inputs = self.tokenizer(texts, return_tensors="pt", padding=True,
-                                truncation=True, max_length=512)
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-        probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
+    def load(self) -> "NewsClassifier":
+        """Carrega tokenizer e modelo uma única vez (thread-safe)."""
+        if self.tokenizer is not None:
+            return self
+        with self._load_lock:
+            if self.tokenizer is not None:
+                return self
+            import torch
+            from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+            if self.onnx_path:
+                # int8 no CPU: metade/um quarto do tráfego de memória dos pesos fp32
+                self.session = _ort_session(self.onnx_path)
+                self._ort_inputs = [i.name for i in self.session.get_inputs()]
+            else:
+                self.device = "cuda" if torch.cuda.is_available() else "cpu"
+                model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+                model.to(self.device).eval()
+                if self.device == "cuda":
+                    model.half()  # fp16 nos tensor cores; softmax volta para float32
+                if self.compile_model and hasattr(torch, "compile"):
+                    # compila o grafo uma vez; dynamic=True evita recompilar a cada tamanho de lote
+                    model = torch.compile(model, mode="reduce-overhead", dynamic=True)
+                self.model = model
+            # por último: tokenizer != None sinaliza "carregado" para as outras threads
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        return self
+
+    def _logits(self, inputs) -> "torch.Tensor":
+        import torch
+
+        if self.session is not None:
+            feed = {name: inputs[name].numpy() for name in self._ort_inputs if name in inputs}
+            return torch.from_numpy(self.session.run(None, feed)[0])
+        return self.model(**inputs).logits
+
+    def classify_texts(self, texts: List[str], batch_size: int = BATCH_SIZE) -> List[Dict]:
+        if not texts:
+            return []
+        self.load()
+        import torch
+
+        # Tokeniza uma vez sem padding e ordena por tamanho: cada lote só é
+        # preenchido até o maior título dele, não até o maior de toda a lista.
+        enc = self.tokenizer(texts, truncation=True, max_length=512)
+        ids, masks = enc["input_ids"], enc["attention_mask"]
+        order = sorted(range(len(texts)), key=lambda i: len(ids[i]))
+
+        # Lotes de tamanho fixo: memória limitada e GPU ocupada mesmo com muitos pendentes
+        batches = []
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                inputs = self.tokenizer.pad(
+                    {"input_ids": [ids[i] for i in idx], "attention_mask": [masks[i] for i in idx]},
+                    return_tensors="pt",
+                ).to(self.device)
+                logits = self._logits(inputs)
+                batches.append(torch.nn.functional.softmax(logits.float(), dim=-1).cpu())
+        # desfaz a ordenação: probs[k] volta a corresponder a texts[k]
+        probs = torch.empty((len(texts), len(self.labels)))
+        probs[torch.tensor(order)] = torch.cat(batches)
         results = []
         for text, prob in zip(texts, probs):
             scores = prob.tolist()
@@ -2,6 +2,6 @@ from .google import GoogleNewsFeed
 from .gdelt import GdeltFeed
 
 # Se quiser, exporte também a base:
-from .base import BaseFeed
+from .base import BaseFeed, make_async_client
 
-__all__ = ["GoogleNewsFeed", "GdeltFeed", "BaseFeed"]
+__all__ = ["GoogleNewsFeed", "GdeltFeed", "BaseFeed", "make_async_client"]
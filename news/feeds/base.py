@@ -1,7 +1,77 @@
+import asyncio
+import httpx
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, List, Dict, Optional
+
+# ---------- Cliente HTTP async compartilhado entre feeds (keep-alive + pool) ----------
+ASYNC_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+ASYNC_HEADERS = {"User-Agent": "NewsTracker/1.0 (+https://localhost)"}
+
+
+def today_cutoff() -> datetime:
+    """Início do dia (UTC); os feeds descartam itens publicados antes disso."""
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def make_async_client(verify: bool = True) -> httpx.AsyncClient:
+    """Cria o AsyncClient usado no fan-out de `NewsTracker.update_all_async`."""
+    # retries do transport cobre só falhas de conexão; 429/5xx ficam com get_with_retry
+    transport = httpx.AsyncHTTPTransport(retries=3, verify=verify, limits=ASYNC_LIMITS)
+    return httpx.AsyncClient(headers=ASYNC_HEADERS, transport=transport)
+
+
+# ---------- Retry por status no caminho async (mesma política do Retry das sessões requests) ----------
+# O retries do transport só cobre falha de conexão; 429/5xx são refeitos aqui, com backoff
+# exponencial e respeitando Retry-After quando o servidor manda.
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_AFTER_MAX = 60.0  # teto (s) para um Retry-After: não segura o refresh inteiro
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After em segundos ("120") ou data HTTP ("Wed, 14 Oct 2026 12:00:00 GMT")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+
+
+async def get_with_retry(client: httpx.AsyncClient, url: str, **kwargs: Any) -> httpx.Response:
+    """
+    `client.get` refeito em 429/5xx até RETRY_TOTAL vezes (backoff RETRY_BACKOFF * 2**n).
+    Esgotadas as tentativas devolve a última resposta; o `raise_for_status` fica com quem chama.
+    """
+    attempt = 0
+    while True:
+        response = await client.get(url, **kwargs)
+        if response.status_code not in RETRY_STATUSES or attempt >= RETRY_TOTAL:
+            return response
+        delay = _retry_after(response.headers.get("Retry-After"))
+        if delay is None:
+            delay = RETRY_BACKOFF * (2 ** attempt)
+        await response.aclose()
+        await asyncio.sleep(min(delay, RETRY_AFTER_MAX))
+        attempt += 1
+
 
 class BaseFeed(ABC):
     @abstractmethod
-    def fetch(self) -> List[Dict]:
+    def fetch(self, cutoff: Optional[datetime] = None) -> List[Dict]:
+        """`cutoff`: descarta itens anteriores; None = `today_cutoff()` no momento do fetch."""
         pass
+
+    async def fetch_async(self, client: httpx.AsyncClient, cutoff: Optional[datetime] = None) -> List[Dict]:
+        # Padrão: roda o fetch síncrono numa thread; feeds com HTTP async sobrescrevem
+        return await asyncio.to_thread(self.fetch, cutoff)
@@ -1,7 +1,27 @@
+import httpx
+import logging
 import requests
 from datetime import datetime, timezone
-from typing import List, Dict
-from .base import BaseFeed
+from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from news.utils.log_utils import get_logger
+from .base import BaseFeed, get_with_retry, today_cutoff
+
+logger = get_logger(__name__)
+
+# ---------- HTTP session global com pool + retry (mesmo padrão do google.py) ----------
+_SESSION = requests.Session()
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    raise_on_status=False,
+)
+_ADAPTER = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=_RETRY)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.headers.update({"User-Agent": "NewsTracker/1.0 (+https://localhost)"})
 
 class GdeltFeed(BaseFeed):
     BASE_URL = "https://api.gdeltproject.org/api/v1/search_ftxtsearch/search_ftxtsearch"
@@ -31,7 +51,7 @@ class GdeltFeed(BaseFeed):
         self.verify: bool = verify
         self.region: str = region.upper()
 
-    def fetch(self) -> List[Dict]:
+    def _params(self) -> Dict[str, str]:
         # Monta query: filtra por idioma se região específica
         lang = self.REGION_LANG_MAP.get(self.region, "")
         country = self.REGION_MAP.get(self.region, "")
@@ -40,48 +60,67 @@ class GdeltFeed(BaseFeed):
         else:
             query_str = self.query
 
-        params = {
+        return {
             "query": query_str,
             "output": "artlist",
             "dropdup": "true",
             "maxrecords": str(self.max_items),
         }
+
+    def fetch(self, cutoff: Optional[datetime] = None) -> List[Dict]:
         try:
-            response = requests.get(
+            response = _SESSION.get(
                 self.BASE_URL,
-                params=params,
+                params=self._params(),
                 timeout=self.TIMEOUT,
                 verify=self.verify
             )
             response.raise_for_status()
         except requests.RequestException as e:
-            print(f"[ERROR] Fetch failed for '{self.query}': {e}")
+            logger.error("Fetch failed for '%s': %s", self.query, e)
+            return []
+        return self._parse(response, cutoff)
+
+    async def fetch_async(self, client: httpx.AsyncClient, cutoff: Optional[datetime] = None) -> List[Dict]:
+        # mesmo AsyncClient compartilhado usado pelo GoogleNewsFeed
+        try:
+            response = await get_with_retry(client, self.BASE_URL, params=self._params(), timeout=self.TIMEOUT)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.error("Fetch failed for '%s': %s", self.query, e)
             return []
+        return self._parse(response, cutoff)
 
+    def _parse(self, response, cutoff: Optional[datetime] = None) -> List[Dict]:
         try:
             # Retorno é texto, cada linha = 1 artigo (TSV), sem cabeçalho
             lines = response.text.strip().split("\n")
         except Exception as e:
-            print(f"[ERROR] Decode failed for '{self.query}': {e}")
+            logger.error("Decode failed for '%s': %s", self.query, e)
             return []
 
         news = []
-        cutoff_date = datetime.now(timezone.utc).replace(hour=0, minute=0)
-        print('GDELT found: {}'.format(lines))
+        cutoff_date = cutoff or today_cutoff()
+        # payload inteiro só em DEBUG (formatar a lista custa caro a cada refresh)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("GDELT found %d lines for '%s': %s", len(lines), self.query, lines)
 
         for line in lines[:self.max_items]:
             # Artlist: URL,Datetime,Title,Outlet
             # Exemplo: https://site.com 2024-08-06T08:02:02Z Some Title Jornal X
-            parts = line.strip().split("\t")
-            if len(parts) < 4:
+            # split com limite: no máx. 4 campos, desempacotados direto (sem fatiar lista)
+            try:
+                url, pubdate, title, source = line.strip().split("\t", 3)
+            except ValueError:
                 continue
-            url, pubdate, title, source = parts[:4]
-            
+            source = source.partition("\t")[0]  # colunas extras, se houver, são ignoradas
+
             published_dt = None
             if pubdate:
                 try:
-                    published_dt = datetime.strptime(pubdate, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-                except Exception:
+                    # fromisoformat é implementado em C (strptime não)
+                    published_dt = datetime.fromisoformat(pubdate.rstrip("Z")).replace(tzinfo=timezone.utc)
+                except ValueError:
                     published_dt = None
             if published_dt and published_dt < cutoff_date:
                 continue
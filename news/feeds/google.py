@@ -1,11 +1,18 @@
 import time
+import orjson
+import httpx
 import requests
-import feedparser
 from datetime import datetime, timezone
-from typing import List, Dict
+from email.utils import parsedate_to_datetime
+from lxml import etree
+from typing import List, Dict, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util import Retry
-from .base import BaseFeed
+from news.utils.log_utils import get_logger
+from news.utils.redis_utils import get_redis
+from .base import BaseFeed, get_with_retry, today_cutoff
+
+logger = get_logger(__name__)
 
 # ---------- HTTP session global com pool + retry (menor latência / resiliente) ----------
 _SESSION = requests.Session()
@@ -20,10 +27,38 @@ _ADAPTER = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=_RETRY)
 _SESSION.mount("https://", _ADAPTER)
 _SESSION.headers.update({"User-Agent": "NewsTracker/1.0 (+https://localhost)"})
 
-# ---------- Cache em memória com TTL curto (evita hits repetidos no intervalo) ----------
-_CACHE: Dict[str, Dict] = {}  # key -> {"expires": float_ts, "data": List[Dict]}
+# ---------- Cache com TTL curto (evita hits repetidos no intervalo) ----------
+# Com REDIS_URL definido o cache é compartilhado entre workers (TTL via EX do Redis);
+# caso contrário cai no dict em memória do processo.
+_CACHE: Dict[str, Dict] = {}  # key -> {"expires": float_ts, "data": bytes (orjson)}
 _CACHE_TTL_SEC = 60  # suficiente dado seu REFRESH_INTERVAL em minutos
 
+
+def _cache_get(ckey: str, now: float):
+    r = get_redis()
+    if r is not None:
+        try:
+            raw = r.get(ckey)
+            return orjson.loads(raw) if raw is not None else None
+        except Exception as e:
+            logger.warning("Redis get falhou para '%s': %s", ckey, e)
+    cached = _CACHE.get(ckey)
+    if cached and cached["expires"] > now:
+        # bytes -> objetos novos a cada hit (cópia profunda de graça, sem mutações externas)
+        return orjson.loads(cached["data"])
+    return None
+
+
+def _cache_set(ckey: str, news: List[Dict], now: float) -> None:
+    r = get_redis()
+    if r is not None:
+        try:
+            r.set(ckey, orjson.dumps(news), ex=_CACHE_TTL_SEC)
+            return
+        except Exception as e:
+            logger.warning("Redis set falhou para '%s': %s", ckey, e)
+    _CACHE[ckey] = {"expires": now + _CACHE_TTL_SEC, "data": orjson.dumps(news)}
+
 class GoogleNewsFeed(BaseFeed):
     BASE_URL = "https://news.google.com/rss/search"
     TIMEOUT = 10
@@ -45,81 +80,112 @@ class GoogleNewsFeed(BaseFeed):
     def _cache_key(self) -> str:
         return f"gnews::{self.query}::{self.hl}::{self.region}::{self.ceid}::{self.max_items}"
 
-    def fetch(self) -> List[Dict]:
-        now = time.time()
-        ckey = self._cache_key()
-        cached = _CACHE.get(ckey)
-        if cached and cached["expires"] > now:
-            # retorno defensivo (cópia rasa) para evitar mutações externas
-            return list(cached["data"])
-
-        params = {
+    def _params(self) -> Dict[str, str]:
+        return {
             "q": self.query,
             "hl": self.hl,
             "gl": self.region,
             "ceid": self.ceid,
         }
 
+    def fetch(self, cutoff: Optional[datetime] = None) -> List[Dict]:
+        now = time.time()
+        ckey = self._cache_key()
+        cached = _cache_get(ckey, now)
+        if cached is not None:
+            return cached
+
         try:
             # usa sessão global com pool + retry
             response = _SESSION.get(
                 self.BASE_URL,
-                params=params,
+                params=self._params(),
                 timeout=self.TIMEOUT,
                 verify=self.verify,  # mantém compatibilidade do parâmetro
             )
             response.raise_for_status()
         except requests.RequestException as e:
-            print(f"[ERROR] Fetch failed for '{self.query}': {e}")
+            logger.error("Fetch failed for '%s': %s", self.query, e)
+            return []
+
+        news = self._parse(response.content, cutoff)
+        # salva em cache com TTL
+        _cache_set(ckey, news, now)
+        return news
+
+    async def fetch_async(self, client: httpx.AsyncClient, cutoff: Optional[datetime] = None) -> List[Dict]:
+        now = time.time()
+        ckey = self._cache_key()
+        cached = _cache_get(ckey, now)
+        if cached is not None:
+            return cached
+
+        try:
+            # cliente compartilhado (keep-alive) criado pelo tracker; verify é do cliente
+            response = await get_with_retry(client, self.BASE_URL, params=self._params(), timeout=self.TIMEOUT)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.error("Fetch failed for '%s': %s", self.query, e)
+            return []
+
+        news = self._parse(response.content, cutoff)
+        _cache_set(ckey, news, now)
+        return news
+
+    @staticmethod
+    def _parse_pubdate(value: Optional[str]) -> Optional[datetime]:
+        # RFC 822 ("Mon, 18 Aug 2025 15:25:42 GMT"), normalizado para UTC
+        if not value:
+            return None
+        try:
+            dt = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+    def _parse(self, content: bytes, cutoff: Optional[datetime] = None) -> List[Dict]:
+        # lxml (C) no lugar do feedparser; sem entidades externas nem rede
+        parser = etree.XMLParser(resolve_entities=False, no_network=True, recover=True)
+        try:
+            root = etree.fromstring(content, parser)
+        except etree.XMLSyntaxError as e:
+            logger.error("Parse failed for '%s': %s", self.query, e)
+            return []
+        if root is None:
             return []
 
-        feed = feedparser.parse(response.text)
-        # Only today (mantém sua lógica original)
-        cutoff_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        # Only today (mantém sua lógica original); o tracker passa um cutoff único por refresh
+        cutoff_date = cutoff or today_cutoff()
 
         news: List[Dict] = []
         # processa mais de max_items para permitir filtragem por data e ainda devolver até max_items
-        for entry in feed.entries:
-            # published_parsed preferencial; fallback para updated_parsed
-            published_dt = None
-            try:
-                if hasattr(entry, "published_parsed") and entry.published_parsed:
-                    published_dt = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
-                    published_dt = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
-            except Exception:
-                published_dt = None
+        for entry in root.iter("item"):
+            published_dt = self._parse_pubdate(entry.findtext("pubDate"))
 
             if published_dt and published_dt < cutoff_date:
                 continue
 
-            raw_title = entry.get("title") or ""
-            # Google costuma usar "Título - Fonte"; usa rsplit para evitar cortar títulos que têm '-'
-            source = ""
-            title_only = raw_title
-            if " - " in raw_title:
-                # Ex.: "Apple sobe no pré-mercado - Reuters"
-                title_only, source = raw_title.rsplit(" - ", 1)
-            elif "-" in raw_title:
+            raw_title = entry.findtext("title") or ""
+            # Google costuma usar "Título - Fonte"; corta no último separador para não
+            # quebrar títulos que têm '-'. Ex.: "Apple sobe no pré-mercado - Reuters"
+            title_only, sep, source = raw_title.rpartition(" - ")
+            if not sep:
                 # fallback menos preciso
-                parts = raw_title.split("-")
-                if len(parts) >= 2:
-                    title_only = " ".join(parts[:-1]).strip()
-                    source = parts[-1].strip()
+                title_only, sep, source = raw_title.rpartition("-")
+                if not sep:
+                    title_only, source = raw_title, ""
 
             item = {
                 "title": (title_only or "").strip(),
                 "source": (source or "").strip(),
-                "link": entry.get("link"),
-                "region": entry.get("region", self.region),
+                "link": (entry.findtext("link") or "").strip() or None,
+                "region": self.region,
                 "published": published_dt.isoformat() if published_dt else None,
-                "summary": entry.get("summary"),
+                "summary": entry.findtext("description"),
             }
             news.append(item)
 
             if len(news) >= self.max_items:
                 break
 
-        # salva em cache com TTL
-        _CACHE[ckey] = {"expires": now + _CACHE_TTL_SEC, "data": news}
         return news
@@ -29,14 +29,102 @@ from __future__ import annotations
 
 from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from urllib.parse import urlparse
 import os
+import heapq
+import inspect
 import html
-import json
 import platform
 
 # Tipagem leve do provider
-GetAllNewsFn = Callable[[], Iterable[Any]]
+# (aceita opcionalmente status=/since= para o provider filtrar na origem)
+GetAllNewsFn = Callable[..., Iterable[Any]]
+
+_UTC = timezone.utc
+_ISO_CACHE_MAX = 4096  # limite do cache de timestamps (evita crescer com chaves únicas)
+
+
+def _accepts_filters(fn: Callable[..., Any]) -> bool:
+    try:
+        params = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return False
+    return "status" in params and "since" in params
+
+
+# ---------- Helpers de renderização (puros, memoizados) ----------
+# Hosts se repetem entre itens da mesma fonte: o cache por link evita um urlparse por linha.
+@lru_cache(maxsize=256)
+def _host_from_link(link: Optional[str]) -> str:
+    if not link:
+        return ""
+    try:
+        host = urlparse(link).netloc or ""
+        return host.replace("www.", "")
+    except Exception:
+        return ""
+
+
+@lru_cache(maxsize=1024)
+def _age_label(mins: int) -> str:
+    if mins < 1:
+        return "agora"
+    if mins < 60:
+        return f"{mins} min atrás"
+    hours = mins // 60
+    if hours < 24:
+        return f"{hours} h atrás"
+    days = hours // 24
+    return f"{days} d atrás"
+
+
+_ESC_SEP = "\x1f"  # separador de unidade: html.escape não o altera
+
+
+def _escape_columns(*columns: List[str]) -> List[List[str]]:
+    """
+    Faz html.escape de várias colunas de uma vez: junta tudo com _ESC_SEP, escapa o
+    buffer único e reparte. Se algum campo já contiver o separador, escapa um a um.
+    """
+    flat = [v for col in columns for v in col]
+    parts = html.escape(_ESC_SEP.join(flat)).split(_ESC_SEP)
+    if len(parts) != len(flat):
+        parts = [html.escape(v) for v in flat]
+    out: List[List[str]] = []
+    start = 0
+    for col in columns:
+        out.append(parts[start:start + len(col)])
+        start += len(col)
+    return out
+
+
+# Linha da tabela do e-mail (bullet + link + metadados), montada uma vez no import
+_ROW_TMPL = (
+    "<tr>"
+    "<td valign='top' style='width:18px;padding:6px 6px 6px 0'>•</td>"
+    "<td valign='top' style='padding:6px 0'>"
+    "<div style='margin:0 0 2px'><a href='{link}' style='color:#0d6efd;text-decoration:none;'>{title}</a></div>"
+    "<div style='font-size:12px;color:#6c757d'>{meta}</div>"
+    "</td>"
+    "</tr>"
+)
+
+# Chips prontos (montados uma vez no import)
+_CHIP_POS = ("<span style='display:inline-block;background:#D1E7DD;"  # verde
+             "color:#0F5132;border-radius:12px;padding:2px 8px;"
+             "font-size:12px;line-height:1;'>Positivo</span>")
+_CHIP_NEG = ("<span style='display:inline-block;background:#F8D7DA;"  # vermelho
+             "color:#842029;border-radius:12px;padding:2px 8px;"
+             "font-size:12px;line-height:1;'>Negativo</span>")
+_CHIP_NEU = ("<span style='display:inline-block;background:#E9ECEF;"  # neutro
+             "color:#495057;border-radius:12px;padding:2px 8px;"
+             "font-size:12px;line-height:1;'>Neutro</span>")
+_CHIP_MAP = {"pos": _CHIP_POS, "neg": _CHIP_NEG}
+
+
+def _sentiment_chip(sentiment: str) -> str:
+    return _CHIP_MAP.get((sentiment or "").strip().lower()[:3], _CHIP_NEU)
 
 
 class Notifier:
@@ -55,6 +143,8 @@ class Notifier:
         get_all_news : callable
             Função que retorna iterável de itens de notícia. Cada item deve ter
             campos/atributos: status, published, title, link, sentiment, source, topic, region.
+            Se aceitar `status` e `since` (como repository.get_all_news), o filtro de
+            fresh/janela é feito na origem e só os candidatos chegam aqui.
         default_to : str, optional
             E-mail padrão para Outlook (fallback quando `to` não é passado).
         teams_webhook_url : str, optional
@@ -63,9 +153,15 @@ class Notifier:
             Janela padrão (horas) para filtrar itens fresh.
         """
         self._get_all_news = get_all_news
+        self._provider_filters = _accepts_filters(get_all_news)
         self.default_to = default_to
         self.teams_webhook_url = teams_webhook_url
         self.default_window_hours = default_window_hours
+        # published (str ISO) -> datetime aware; os mesmos timestamps se repetem entre filtro,
+        # ordenação e renderização do digest
+        self._iso_cache: Dict[str, Optional[datetime]] = {}
+        # sessão HTTP criada no primeiro envio ao Teams e reaproveitada (keep-alive/TLS)
+        self._http: Any = None
 
     # ---------- Fábrica baseada em .env ----------
     @classmethod
@@ -92,15 +188,23 @@ class Notifier:
         )
 
     # ---------- Helpers internos ----------
-    @staticmethod
-    def _parse_iso(ts: Optional[str]) -> Optional[datetime]:
+    def _parse_iso(self, ts: Optional[str]) -> Optional[datetime]:
         if not ts:
             return None
+        cache = self._iso_cache
+        try:
+            return cache[ts]
+        except KeyError:
+            pass
         try:
             dt = datetime.fromisoformat(ts)
-            return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+            dt = dt if dt.tzinfo else dt.replace(tzinfo=_UTC)
         except Exception:
-            return None
+            dt = None
+        if len(cache) >= _ISO_CACHE_MAX:
+            cache.clear()
+        cache[ts] = dt
+        return dt
 
     @staticmethod
     def _get(item: Any, name: str, default: Any = None) -> Any:
@@ -109,6 +213,15 @@ class Notifier:
             return item.get(name, default)
         return getattr(item, name, default)
 
+    @staticmethod
+    def _column(items: List[Any], name: str) -> List[Any]:
+        """Extrai um campo de todos os itens de uma vez (dict ou objeto, decidido uma vez)."""
+        if not items:
+            return []
+        if isinstance(items[0], dict):
+            return [it.get(name) for it in items]
+        return [getattr(it, name, None) for it in items]
+
     @staticmethod
     def _group_by_topic(items: List[Any]) -> Dict[Tuple[str, str], List[Any]]:
         groups: Dict[Tuple[str, str], List[Any]] = {}
@@ -119,12 +232,20 @@ class Notifier:
             groups.setdefault(key, []).append(it)
         return groups
 
+    def _http_session(self) -> Any:
+        if self._http is None:
+            import requests  # local import para evitar dependência quando não usado
+
+            self._http = requests.Session()
+            self._http.headers["Content-Type"] = "application/json"
+        return self._http
+
     @staticmethod
     def _is_windows() -> bool:
         return platform.system() == "Windows"
 
     # ---------- Coleta e renderização ----------
-    def collect_fresh_news(self, hours: Optional[int] = None) -> List[Any]:
+    def collect_fresh_news(self, hours: Optional[int] = None, limit: Optional[int] = None) -> List[Any]:
         """
         Retorna itens com status 'fresh' e publicados na janela definida.
 
@@ -132,22 +253,33 @@ class Notifier:
         ----------
         hours : int, optional
             Janela em horas. Se None, usa self.default_window_hours.
+        limit : int, optional
+            Se informado, retorna só os `limit` mais recentes (heap parcial em vez de ordenar tudo).
         """
         h = hours if hours is not None else self.default_window_hours
         now = datetime.now(timezone.utc)
         cutoff = now - timedelta(hours=h)
 
-        items: List[Any] = []
-        for n in self._get_all_news():
+        # decorate: (datetime, -idx, item) -> comparação só entre tuplas de datetime/int;
+        # -idx mantém a ordem original em empates sem nunca comparar os itens
+        decorated: List[Tuple[datetime, int, Any]] = []
+        if self._provider_filters:
+            source = self._get_all_news(status="fresh", since=cutoff)
+        else:
+            source = self._get_all_news()
+        for idx, n in enumerate(source):
             if self._get(n, "status") != "fresh":
                 continue
             dt = self._parse_iso(self._get(n, "published"))
             if dt and dt >= cutoff:
-                items.append(n)
+                decorated.append((dt, -idx, n))
 
         # Mais recentes primeiro
-        items.sort(key=lambda x: self._get(x, "published") or "", reverse=True)
-        return items
+        if limit is not None:
+            top = heapq.nlargest(limit, decorated)
+        else:
+            top = sorted(decorated, reverse=True)
+        return [n for _, _, n in top]
 
     # --- dentro de Notifier (substitua/adicione estes métodos) ---
 
@@ -155,44 +287,9 @@ class Notifier:
         dt = self._parse_iso(ts_str)
         if not dt:
             return ""
-        now = now or datetime.now(timezone.utc)
-        delta = now - dt
-        mins = int(delta.total_seconds() // 60)
-        if mins < 1:
-            return "agora"
-        if mins < 60:
-            return f"{mins} min atrás"
-        hours = mins // 60
-        if hours < 24:
-            return f"{hours} h atrás"
-        days = hours // 24
-        return f"{days} d atrás"
-
-    def _host_from_link(self, link: Optional[str]) -> str:
-        if not link:
-            return ""
-        try:
-            host = urlparse(link).netloc or ""
-            return host.replace("www.", "")
-        except Exception:
-            return ""
-
-    def _sentiment_chip(self, sentiment: str) -> str:
-        s = (sentiment or "").strip().lower()
-        if s.startswith("pos"):
-            # verde
-            return ("<span style='display:inline-block;background:#D1E7DD;"
-                    "color:#0F5132;border-radius:12px;padding:2px 8px;"
-                    "font-size:12px;line-height:1;'>Positivo</span>")
-        if s.startswith("neg"):
-            # vermelho
-            return ("<span style='display:inline-block;background:#F8D7DA;"
-                    "color:#842029;border-radius:12px;padding:2px 8px;"
-                    "font-size:12px;line-height:1;'>Negativo</span>")
-        # neutro
-        return ("<span style='display:inline-block;background:#E9ECEF;"
-                "color:#495057;border-radius:12px;padding:2px 8px;"
-                "font-size:12px;line-height:1;'>Neutro</span>")
+        now = now or datetime.now(_UTC)
+        # idade em minutos inteiros: o rótulo só muda na virada do minuto
+        return _age_label(int((now - dt).total_seconds() // 60))
 
     def render_email_html(
         self,
@@ -221,6 +318,8 @@ class Notifier:
             f"<div style='margin:0 0 12px;color:#6c757d'>Total: {len(items)} item(s)</div>"
         )
 
+        now = datetime.now(_UTC)
+
         # Para cada grupo, bloco com título + tabela
         for (topic, region), lst in groups.items():
             # limita por tópico, se necessário
@@ -240,35 +339,31 @@ class Notifier:
                 "style='width:100%;border-collapse:collapse;margin:0 0 8px'>"
             )
 
-            for it in shown:
-                title = html.escape(self._get(it, "title") or "")
-                link = html.escape(self._get(it, "link") or "#")
-                sent = (self._get(it, "sentiment") or "").strip()
-                chip = self._sentiment_chip(sent) if sent else ""
-                src = self._get(it, "source") or ""
-                host = self._host_from_link(self._get(it, "link"))
-                ts_iso = self._get(it, "published") or ""
-                ts_rel = self._humanize_dt(ts_iso)
-
-                # linha
-                html_parts.append(
-                    "<tr>"
-                    # bullet
-                    "<td valign='top' style='width:18px;padding:6px 6px 6px 0'>•</td>"
-                    # conteúdo
-                    "<td valign='top' style='padding:6px 0'>"
-                    f"<div style='margin:0 0 2px'><a href='{link}' "
-                    "style='color:#0d6efd;text-decoration:none;'>"
-                    f"{title}</a></div>"
-                    f"<div style='font-size:12px;color:#6c757d'>"
-                    f"{html.escape(src)}{(' — ' + host) if host else ''}"
-                    f"{(' — ' + chip) if chip else ''}"
-                    f"{(' — ' + html.escape(ts_rel)) if ts_rel else ''}"
-                    f"{(' — ' + html.escape(ts_iso)) if ts_iso else ''}"
-                    "</div>"
-                    "</td>"
-                    "</tr>"
-                )
+            # colunas do grupo (SoA): cada campo extraído/escapado uma única vez
+            raw_links = self._column(shown, "link")
+            raw_isos = [t or "" for t in self._column(shown, "published")]
+            titles, links, srcs, ts_isos = _escape_columns(
+                [t or "" for t in self._column(shown, "title")],
+                [l or "#" for l in raw_links],
+                [s or "" for s in self._column(shown, "source")],
+                raw_isos,
+            )
+            hosts = [_host_from_link(l) for l in raw_links]
+            sents = [(s or "").strip() for s in self._column(shown, "sentiment")]
+            chips = [_sentiment_chip(s) if s else "" for s in sents]
+            # rótulos gerados aqui ("agora", "5 min atrás"): não precisam de escape
+            ts_rels = [self._humanize_dt(t, now) if t else "" for t in raw_isos]
+            # linha de metadados: fonte e, depois, cada parte não vazia precedida de " — "
+            metas = [
+                src + "".join(" — " + part for part in (host, chip, ts_rel, ts_iso) if part)
+                for src, host, chip, ts_rel, ts_iso in zip(srcs, hosts, chips, ts_rels, ts_isos)
+            ]
+
+            # um format por linha sobre o template pronto
+            html_parts.extend(
+                _ROW_TMPL.format(link=link, title=title, meta=meta)
+                for link, title, meta in zip(links, titles, metas)
+            )
 
             html_parts.append("</table>")
 
@@ -307,7 +402,7 @@ class Notifier:
 
     def send_to_teams(self, webhook_url: str, title: str, summary_text: str, items: List[Any]) -> None:
         """Posta um card simples em um Incoming Webhook do Teams."""
-        import requests  # local import para evitar dependência quando não usado
+        import orjson  # local import para evitar dependência quando não usado
 
         # Lista compacta (limites de payload)
         lines: List[str] = []
@@ -316,12 +411,7 @@ class Notifier:
             lines.append(f"- {t[:180]}")
 
         payload = {"title": title, "text": summary_text + "\n\n" + "\n".join(lines)}
-        resp = requests.post(
-            webhook_url,
-            data=json.dumps(payload),
-            headers={"Content-Type": "application/json"},
-            timeout=10,
-        )
+        resp = self._http_session().post(webhook_url, data=orjson.dumps(payload), timeout=10)
         resp.raise_for_status()
 
     # ---------- Orquestração de alto nível ----------
@@ -1,12 +1,23 @@
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+import orjson
 from news.tracker.news_tracker import NewsTracker
 
 STORAGE_DIR = os.path.join(os.path.dirname(__file__), "data")
 os.makedirs(STORAGE_DIR, exist_ok=True)
+_MAX_EXPORT_WORKERS = 8
+
+def _dump_one(entry: Tuple[str, List[Dict]]) -> None:
+    topic, news_list = entry
+    file_path = os.path.join(STORAGE_DIR, f"{topic}_history.json")
+    with open(file_path, "wb") as f:
+        f.write(orjson.dumps(news_list, option=orjson.OPT_INDENT_2))
 
 def export_all_news_to_json(tracker: NewsTracker):
-    for topic, news_list in tracker.all_news.items():
-        file_path = os.path.join(STORAGE_DIR, f"{topic}_history.json")
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(news_list, f, ensure_ascii=False, indent=2)
+    # um arquivo por tópico; as escritas em disco se sobrepõem no pool
+    entries = [(topic, list(news)) for topic, news in tracker.all_news.items()]
+    if not entries:
+        return
+    with ThreadPoolExecutor(max_workers=min(_MAX_EXPORT_WORKERS, len(entries))) as ex:
+        list(ex.map(_dump_one, entries))  # list() propaga exceções das threads
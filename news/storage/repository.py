@@ -1,12 +1,72 @@
-import os, json
+import os, re, sqlite3, time
+import orjson
+from collections import deque
+from functools import lru_cache
 from threading import Lock
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta, timezone
-from pydantic import BaseModel
+from typing import Any, Deque, Iterable, List, Dict, Optional, Tuple
+from datetime import datetime, timezone
+from pydantic import BaseModel, field_validator
+from news.utils.log_utils import get_logger
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "data", "news_db.json")
+logger = get_logger(__name__)
+
+# ---------- Banco (SQLite) ----------
+# Cada operação vira um INSERT/UPDATE/DELETE indexado em vez de reler e regravar
+# o arquivo inteiro. O JSON antigo é importado uma vez, se o banco estiver vazio.
+DB_PATH = os.path.join(os.path.dirname(__file__), "data", "news.db")
+LEGACY_JSON_PATH = os.path.join(os.path.dirname(__file__), "data", "news_db.json")
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 db_lock = Lock()
+# Fila em memória (link, título) das notícias inseridas e ainda sem sentimento;
+# consumida pelo job de classificação sem varrer o banco inteiro.
+_pending_sentiment: Deque[Tuple[str, str]] = deque()
+
+# colunas gravadas; o status não é persistido (é função de published e do "agora")
+_COLUMNS = (
+    "norm_title", "link", "title", "published", "source", "region",
+    "summary", "topic", "fetched_at", "sentiment", "probabilities",
+    "published_ts",
+)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    norm_title    TEXT PRIMARY KEY,
+    link          TEXT UNIQUE,
+    title         TEXT NOT NULL,
+    published     TEXT,
+    source        TEXT,
+    region        TEXT,
+    summary       TEXT,
+    topic         TEXT NOT NULL,
+    fetched_at    TEXT,
+    sentiment     TEXT,
+    probabilities TEXT,
+    published_ts  INTEGER  -- published em unix seconds: filtros de status/janela no SQL
+);
+CREATE INDEX IF NOT EXISTS idx_news_link ON news(link);
+CREATE INDEX IF NOT EXISTS idx_news_topic ON news(topic);
+CREATE INDEX IF NOT EXISTS idx_news_published_ts ON news(published_ts);
+"""
+_INSERT_SQL = (
+    f"INSERT OR IGNORE INTO news ({', '.join(_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _COLUMNS)})"
+)
+# campos lidos, na mesma ordem de NewsItem
+_READ_FIELDS = (
+    "link", "title", "published", "source", "region", "summary",
+    "topic", "status", "fetched_at", "sentiment", "probabilities",
+)
+# Leitura com status calculado pelo próprio SQLite a partir de published_ts (mesmos
+# limites de classify_news_status); parâmetros: início da janela fresh e da new.
+_STATUS_SQL = "CASE WHEN published_ts >= ? THEN 'fresh' WHEN published_ts >= ? THEN 'new' ELSE 'old' END"
+_SELECT_LIVE_SQL = "SELECT " + ", ".join(
+    _STATUS_SQL if f == "status" else f for f in _READ_FIELDS
+) + " FROM news"
+
+# conexão única por processo (reaberta se DB_PATH mudar, ex.: nos testes);
+# todo acesso passa por db_lock
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+_write_seq = 0  # escritas desta conexão (PRAGMA data_version só vê as de outras)
 
 class NewsItem(BaseModel):
     link: str
@@ -16,137 +76,314 @@ class NewsItem(BaseModel):
     region: Optional[str] = None
     summary: Optional[str] = None
     topic: str
-    status: Optional[str] = None  # 'old', 'new', 'fresh'
+    status: Optional[str] = None  # 'old', 'new', 'fresh' — calculado na leitura, não persistido
     fetched_at: Optional[str] = None
     sentiment: Optional[str] = None
-    probabilities: Optional[dict] = None
+    # JSON já serializado na escrita (o dict só é montado por quem precisa: probabilities_dict)
+    probabilities: Optional[str] = None
+
+    @field_validator("probabilities", mode="before")
+    @classmethod
+    def _serialize_probabilities(cls, v: Any) -> Any:
+        return _dump_probs(v) if isinstance(v, dict) else v
+
+    def probabilities_dict(self) -> Optional[dict]:
+        return orjson.loads(self.probabilities) if self.probabilities else None
+
+# ---------- Normalização de títulos ----------
+# Mantém só alfanuméricos e espaços (mesma regra de str.isalnum/isspace), tudo em C:
+# tabela de translate para ASCII e regex Unicode para o resto.
+_ASCII_DROP = {c: None for c in range(128) if not (chr(c).isalnum() or chr(c).isspace())}
+_NON_WORD_RE = re.compile(r"[^\w\s]|_")
 
+# o mesmo título volta a cada ciclo de fetch enquanto estiver no feed
+@lru_cache(maxsize=100_000)
 def normalize(text: str) -> str:
-    return ''.join(e.lower() for e in text if e.isalnum() or e.isspace()).strip()
+    if text.isascii():
+        return text.translate(_ASCII_DROP).lower().strip()
+    return _NON_WORD_RE.sub("", text).lower().strip()
 
-def load_db() -> Dict[str, NewsItem]:
-    if not os.path.exists(DB_PATH):
-        return {}
+def _get_conn() -> sqlite3.Connection:
+    """Abre (ou reaproveita) a conexão de DB_PATH; chamar com db_lock."""
+    global _conn, _conn_path
+    if _conn is not None and _conn_path == DB_PATH:
+        return _conn
+    if _conn is not None:
+        _conn.close()
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    _conn, _conn_path = conn, DB_PATH
+    _import_legacy_json(conn)
+    return conn
+
+def _import_legacy_json(conn: sqlite3.Connection) -> None:
+    if not os.path.exists(LEGACY_JSON_PATH):
+        return
+    if conn.execute("SELECT 1 FROM news LIMIT 1").fetchone():
+        return
     try:
-        with open(DB_PATH, "r", encoding="utf-8") as f:
-            raw = json.load(f)
-        return {normalize(item["title"]): NewsItem(**item) for item in raw}
-    except (json.JSONDecodeError, ValueError):
-        print("[WARN] news_db.json está vazio ou corrompido. Recriando do zero.")
-        return {}
-
-def save_db(db: Dict[str, NewsItem]):
-    with open(DB_PATH, "w", encoding="utf-8") as f:
-        json.dump([n.model_dump() for n in db.values()], f, ensure_ascii=False, indent=2)
-
-def classify_news_status(publ: Optional[str], now: datetime) -> str:
-    if not publ:
-        return "old"
+        with open(LEGACY_JSON_PATH, "rb") as f:
+            raw = orjson.loads(f.read())
+        rows = [_to_row(NewsItem(**item)) for item in raw if item.get("title")]
+    except ValueError:  # orjson.JSONDecodeError e ValidationError do pydantic
+        logger.warning("news_db.json está vazio ou corrompido. Ignorando importação.")
+        return
+    with conn:
+        conn.executemany(_INSERT_SQL, rows)
+    logger.info("Importadas %d notícias de %s", len(rows), LEGACY_JSON_PATH)
+
+def _to_row(n: NewsItem) -> Tuple[Any, ...]:
+    return (
+        normalize(n.title), n.link, n.title, n.published, n.source, n.region,
+        n.summary, n.topic, n.fetched_at, n.sentiment, n.probabilities,
+        _pub_ts(n.published) if n.published else None,
+    )
+
+def _dump_probs(probabilities: Any) -> Optional[str]:
+    if probabilities is None or isinstance(probabilities, str):
+        return probabilities
+    return orjson.dumps(probabilities).decode()
+
+def _from_row(row: Tuple[Any, ...]) -> NewsItem:
+    link, title, published, source, region, summary, topic, status, fetched_at, sentiment, probs = row
+    return NewsItem(
+        link=link, title=title, source=source or "", published=published, region=region,
+        summary=summary, topic=topic, status=status, fetched_at=fetched_at,
+        sentiment=sentiment, probabilities=probs,
+    )
+
+def _committed(conn: sqlite3.Connection) -> None:
+    global _write_seq
+    conn.commit()
+    _write_seq += 1
+
+def db_version() -> int:
+    """Muda a cada escrita no banco (deste processo ou de outro); usado para ETag das rotas de leitura."""
+    with db_lock:
+        data_version = _get_conn().execute("PRAGMA data_version").fetchone()[0]
+    return (data_version << 32) | _write_seq
+
+# ---------- Status por idade ----------
+# Limites em segundos inteiros: a classificação vira duas comparações de int.
+_FRESH_SECS = 30 * 60
+_NEW_SECS = 6 * 60 * 60  # <= 6h é NEW, >6h é OLD
+_PUB_TS_CACHE_MAX = 65536
+# published (str ISO) -> unix seconds; None quando não parseável
+_pub_ts_cache: Dict[str, Optional[int]] = {}
+
+def _pub_ts(publ: str) -> Optional[int]:
+    try:
+        return _pub_ts_cache[publ]
+    except KeyError:
+        pass
     try:
         pub_dt = datetime.fromisoformat(publ)
         if pub_dt.tzinfo is None:
             pub_dt = pub_dt.replace(tzinfo=timezone.utc)
-        if now.tzinfo is None:
-            now = now.replace(tzinfo=timezone.utc)
+        ts: Optional[int] = int(pub_dt.timestamp())
     except Exception:
+        ts = None
+    if len(_pub_ts_cache) >= _PUB_TS_CACHE_MAX:
+        _pub_ts_cache.clear()
+    _pub_ts_cache[publ] = ts
+    return ts
+
+def classify_news_status(publ: Optional[str], now_ts: int) -> str:
+    """Status pela idade de `publ` em relação a `now_ts` (unix seconds)."""
+    if not publ:
+        return "old"
+    pub_ts = _pub_ts(publ)
+    if pub_ts is None:
         return "old"
-    delta = now - pub_dt
-    if delta <= timedelta(minutes=30):
+    delta = now_ts - pub_ts
+    if delta <= _FRESH_SECS:
         return "fresh"
-    elif delta <= timedelta(hours=6):  # <= 6h é NEW, >6h é OLD
+    elif delta <= _NEW_SECS:
         return "new"
     else:
         return "old"
 
 def add_news_batch(news_list: List[Dict], topic: str, start_ts: int):
-    now_dt = datetime.now(timezone.utc)
-    now_iso = now_dt.isoformat()
+    now_iso = datetime.now(timezone.utc).isoformat()
+    rows: List[Tuple[Any, ...]] = []
+    batch_titles = set()
+    batch_links = set()
+    for item in news_list:
+        title = item.get("title")
+        link = item.get("link")
+        if not title or not link:
+            continue
+        publ = item.get("published")
+        # Busca a região do tópico se não houver na notícia
+        region = item.get('region') or "GLOBAL"
+        norm_title = normalize(title)  # normalize já faz strip; chave de cache = título cru
+        if norm_title in batch_titles or link in batch_links:
+            continue
+        batch_titles.add(norm_title)
+        batch_links.add(link)
+
+        rows.append((
+            norm_title, link, title, publ, item.get("source") or "", region,
+            item.get("summary"), topic, now_iso, None, None,
+            _pub_ts(publ) if publ else None,
+        ))
+    if not rows:
+        return
+
     with db_lock:
-        db = load_db()
-        seen_titles = set(db.keys())
-        for item in news_list:
-            title = item.get("title")
-            link = item.get("link")
-            if not title or not link:
-                continue
-            publ = item.get("published")
-            region = item.get('region')
-            # Busca a região do tópico se não houver na notícia
-            if not region:
-                region = "GLOBAL"
-            norm_title = normalize(title.strip())
-            #print('REGION:', region)
-
-
-            # Classificação por tempo (status)
-            status = classify_news_status(publ, now_dt)
-            if norm_title not in seen_titles:
-                db[norm_title] = NewsItem(
-                    **item,
-                    topic=topic,
-                    status=status,
-                    fetched_at=now_iso,
-                    sentiment=None,
-                    probabilities=None,
-                )
-                seen_titles.add(norm_title)
-        save_db(db)
+        conn = _get_conn()
+        # descarta o que já existe (por título normalizado ou link) para saber
+        # exatamente quem entra na fila de sentimento
+        marks = ", ".join("?" for _ in rows)
+        existing = conn.execute(
+            f"SELECT norm_title, link FROM news WHERE norm_title IN ({marks}) OR link IN ({marks})",
+            [r[0] for r in rows] + [r[1] for r in rows],
+        ).fetchall()
+        seen_titles = {t for t, _ in existing}
+        seen_links = {l for _, l in existing}
+        rows = [r for r in rows if r[0] not in seen_titles and r[1] not in seen_links]
+        if not rows:
+            return
+        conn.executemany(_INSERT_SQL, rows)
+        _committed(conn)
+        _pending_sentiment.extend((r[1], r[2]) for r in rows)
 
-def get_news_by_topic(topic: str, status_filter: Optional[str] = None):
+def _status_clause(status: str, now_ts: int) -> Tuple[str, List[Any]]:
+    """Mesmos limites de classify_news_status, como filtro SQL sobre published_ts."""
+    fresh_from = now_ts - _FRESH_SECS
+    new_from = now_ts - _NEW_SECS
+    if status == "fresh":
+        return "published_ts >= ?", [fresh_from]
+    if status == "new":
+        return "published_ts >= ? AND published_ts < ?", [new_from, fresh_from]
+    if status == "old":
+        return "(published_ts IS NULL OR published_ts < ?)", [new_from]
+    return "0", []  # status desconhecido: nada casa
+
+def _select_rows(where: List[str], params: List[Any], now_ts: int) -> List[Tuple[Any, ...]]:
+    """Linhas (campos de NewsItem) com o status pela idade no momento da leitura, sem regravar o banco."""
+    sql = _SELECT_LIVE_SQL
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    args = [now_ts - _FRESH_SECS, now_ts - _NEW_SECS] + params
     with db_lock:
-        db = load_db()
-        all_items = [n for n in db.values() if n.topic == topic]
-        now_dt = datetime.now(timezone.utc)
-        updated = False
-        for n in all_items:
-            new_status = classify_news_status(n.published, now_dt)
-            if n.status != new_status:
-                n.status = new_status
-                updated = True
-        if updated:
-            # Atualiza apenas o status no banco, sem perder outras notícias
-            for n in all_items:
-                norm = normalize(n.title)
-                db[norm] = n
-            save_db(db)
-        if status_filter:
-            all_items = [n for n in all_items if n.status == status_filter]
-        return sorted(all_items, key=lambda n: n.published or "", reverse=True)
-    
+        return _get_conn().execute(sql + " ORDER BY published DESC", args).fetchall()
+
+def _select_news(where: List[str], params: List[Any], now_ts: int) -> List[NewsItem]:
+    return [_from_row(r) for r in _select_rows(where, params, now_ts)]
+
+def _all_news_filters(status: Optional[str], since: Optional[datetime], now_ts: int) -> Tuple[List[str], List[Any]]:
+    where: List[str] = []
+    params: List[Any] = []
+    if status:
+        clause, args = _status_clause(status, now_ts)
+        where.append(clause)
+        params += args
+    if since is not None:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        where.append("published_ts >= ?")
+        params.append(int(since.timestamp()))
+    return where, params
+
+def get_news_by_topic(topic: str, status_filter: Optional[str] = None):
+    now_ts = int(time.time())
+    where, params = ["topic = ?"], [topic]
+    if status_filter:
+        clause, args = _status_clause(status_filter, now_ts)
+        where.append(clause)
+        params += args
+    return _select_news(where, params, now_ts)
+
 def mark_read(link: str) -> bool:
     with db_lock:
-        db = load_db()
-        for key, item in db.items():
-            if item.link == link:
-                save_db(db)
-                return True
-    return False
+        return _get_conn().execute("SELECT 1 FROM news WHERE link = ?", (link,)).fetchone() is not None
 
 def delete_news(link: str) -> bool:
     with db_lock:
-        db = load_db()
-        for key in list(db.keys()):
-            if db[key].link == link:
-                del db[key]
-                save_db(db)
-                return True
-    return False
-
-def get_all_news() -> List[NewsItem]:
-    with db_lock:
-        return list(load_db().values())
+        conn = _get_conn()
+        deleted = conn.execute("DELETE FROM news WHERE link = ?", (link,)).rowcount
+        if not deleted:
+            conn.rollback()
+            return False
+        _committed(conn)
+        return True
+
+def get_all_news(status: Optional[str] = None, since: Optional[datetime] = None) -> List[NewsItem]:
+    """
+    Todas as notícias (mais recentes primeiro), opcionalmente filtradas no SQL por
+    status ('fresh'/'new'/'old') e/ou publicadas a partir de `since`.
+    """
+    now_ts = int(time.time())
+    where, params = _all_news_filters(status, since, now_ts)
+    return _select_news(where, params, now_ts)
+
+def get_all_news_raw(status: Optional[str] = None, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Igual a get_all_news, mas devolve dicts simples (sem validação do pydantic);
+    para leitores que só consultam campos, como o Notifier.
+    """
+    now_ts = int(time.time())
+    where, params = _all_news_filters(status, since, now_ts)
+    items: List[Dict[str, Any]] = []
+    for row in _select_rows(where, params, now_ts):
+        d = dict(zip(_READ_FIELDS, row))
+        d["source"] = d["source"] or ""
+        items.append(d)
+    return items
+
+def _set_sentiment(conn: sqlite3.Connection, link_or_title: str, sentiment: str, probabilities: dict) -> bool:
+    probs = _dump_probs(probabilities)
+    cur = conn.execute(
+        "UPDATE news SET sentiment = ?, probabilities = ? WHERE norm_title = ?",
+        (sentiment, probs, normalize(link_or_title)),
+    )
+    if not cur.rowcount:
+        cur = conn.execute(
+            "UPDATE news SET sentiment = ?, probabilities = ? WHERE link = ?",
+            (sentiment, probs, link_or_title),
+        )
+    return cur.rowcount > 0
 
 def update_news_sentiment(link_or_title: str, sentiment: str, probabilities: dict) -> bool:
     with db_lock:
-        db = load_db()
-        norm = normalize(link_or_title)
-        if norm in db:
-            item = db[norm]
-        else:
-            item = next((n for n in db.values() if n.link == link_or_title), None)
-        if not item:
+        conn = _get_conn()
+        if not _set_sentiment(conn, link_or_title, sentiment, probabilities):
             return False
-        item.sentiment = sentiment
-        item.probabilities = probabilities
-        save_db(db)
+        _committed(conn)
         return True
+
+
+def get_pending_sentiment(limit: int = 200) -> List[Tuple[str, str]]:
+    """Retorna até `limit` pares (link ou título, título) de notícias ainda sem sentimento."""
+    with db_lock:
+        rows = _get_conn().execute(
+            "SELECT link, title FROM news WHERE sentiment IS NULL LIMIT ?", (limit,)
+        ).fetchall()
+    return [(link or title, title) for link, title in rows]
+
+def drain_pending_sentiment(max_items: int) -> List[Tuple[str, str]]:
+    """Retira até `max_items` pares (link, título) da fila de inseridos sem sentimento."""
+    batch: List[Tuple[str, str]] = []
+    while len(batch) < max_items:
+        try:
+            batch.append(_pending_sentiment.popleft())
+        except IndexError:
+            break
+    return batch
+
+def update_news_sentiment_bulk(rows: Iterable[Tuple[str, str, dict]]) -> int:
+    """
+    Aplica vários (link_or_title, sentiment, probabilities) numa única transação.
+    Retorna quantos itens foram atualizados.
+    """
+    with db_lock:
+        conn = _get_conn()
+        updated = sum(_set_sentiment(conn, *row) for row in rows)
+        if updated:
+            _committed(conn)
+        else:
+            conn.rollback()
+        return updated
@@ -1,5 +1,25 @@
-import torch
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
+import os
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+# torch/transformers só são importados em load(): importar este módulo (API, testes,
+# notifier) não paga os segundos de import nem a memória do modelo.
+
+BATCH_SIZE = 8  # textos por chamada do modelo em summarize_batch
+MAX_INPUT_TOKENS = 512  # contexto de treino do mT5-small
+MIN_NEW_TOKENS = 30
+# Tokens: ~130 tokens costuma dar até 10 frases curtas
+MAX_NEW_TOKENS = 130
+# bf16 no CPU é opt-in: só compensa em CPUs com suporte nativo (AVX512-BF16/AMX)
+CPU_BF16 = os.getenv("SUMMARIZER_CPU_BF16", "0") == "1"
+
+
+def _model_dtype(torch: Any, use_cuda: bool) -> Any:
+    # mT5 estoura em fp16 (overflow nas ativações -> NaN), então a meia precisão é bf16
+    if use_cuda:
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float32
+    return torch.bfloat16 if CPU_BF16 else torch.float32
+
 
 class NewsSummarizer:
     """
@@ -9,18 +29,56 @@ class NewsSummarizer:
     """
 
     def __init__(self, model_name="fernandals/mt5-small-finetuned-xlsum-en-pt"):
-        self.device = 0 if torch.cuda.is_available() else -1
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-        self.pipe = pipeline(
-            "summarization",
-            model=self.model,
-            tokenizer=self.tokenizer,
-            device=self.device
-        )
+        # Nada é carregado aqui: tokenizer e modelo sobem no primeiro resumo (ou em load()).
+        self.model_name = model_name
+        self.tokenizer = None
+        self.model = None
+        self.device = "cpu"
+        self.max_input_tokens = MAX_INPUT_TOKENS
+        self._load_lock = Lock()
+        # (idioma, max_lines, prompt) -> ids do cabeçalho "PT <prompt>", tokenizado uma vez
+        self._prefix_ids: Dict[Tuple[str, int, Optional[str]], List[int]] = {}
+
+    def load(self) -> "NewsSummarizer":
+        """Carrega tokenizer e modelo uma única vez (thread-safe)."""
+        if self.tokenizer is not None:
+            return self
+        with self._load_lock:
+            if self.tokenizer is not None:
+                return self
+            import torch
+            from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+            use_cuda = torch.cuda.is_available()
+            self.device = "cuda" if use_cuda else "cpu"
+            model = AutoModelForSeq2SeqLM.from_pretrained(
+                self.model_name, torch_dtype=_model_dtype(torch, use_cuda)
+            )
+            model.to(self.device).eval()
+            self.model = model
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.max_input_tokens = min(tokenizer.model_max_length, MAX_INPUT_TOKENS)
+            # por último: tokenizer != None sinaliza "carregado" para as outras threads
+            self.tokenizer = tokenizer
+        return self
+
+    def _prefix(self, language: str, max_lines: int, prompt: Optional[str]) -> List[int]:
+        key = (language, max_lines, prompt)
+        ids = self._prefix_ids.get(key)
+        if ids is None:
+            lang_prefix = "PT" if language.lower().startswith("pt") else "EN"
+            # Adicione prompt instrucional para formato em tópicos/bullets
+            if not prompt:
+                if language.lower().startswith("pt"):
+                    prompt = f"Liste os principais pontos da notícia abaixo em até {max_lines} tópicos:\n"
+                else:
+                    prompt = f"List the key takeaways from the following news in up to {max_lines} bullet points:\n"
+            ids = self.tokenizer(f"{lang_prefix} {prompt}", add_special_tokens=False)["input_ids"]
+            self._prefix_ids[key] = ids
+        return ids
 
     def summarize(
-        self, 
+        self,
         text: str,
         language: str = "pt",
         max_lines: int = 10,
@@ -34,21 +92,52 @@ class NewsSummarizer:
         :param prompt: Instrução opcional (para bullet points).
         :return: Resumo como string.
         """
-        lang_prefix = "PT" if language.lower().startswith("pt") else "EN"
-        # Adicione prompt instrucional para formato em tópicos/bullets
-        if not prompt:
-            if language.lower().startswith("pt"):
-                prompt = f"Liste os principais pontos da notícia abaixo em até {max_lines} tópicos:\n"
-            else:
-                prompt = f"List the key takeaways from the following news in up to {max_lines} bullet points:\n"
-        # Combine prefixo de idioma, prompt e texto
-        input_text = f"{lang_prefix} {prompt}{text.strip()}"
-        # Tokens: ~130 tokens costuma dar até 10 frases curtas
-        out = self.pipe(
-            input_text,
-            max_length=130,
-            min_length=30,
-            do_sample=False,
+        return self.summarize_batch([text], language=language, max_lines=max_lines, prompt=prompt)[0]
+
+    def summarize_batch(
+        self,
+        texts: List[str],
+        language: str = "pt",
+        max_lines: int = 10,
+        prompt: str = None,
+        batch_size: int = BATCH_SIZE,
+    ) -> List[str]:
+        """
+        Resume vários textos de uma vez (mesmo idioma/prompt), em lotes de `batch_size`.
+        :return: Lista de resumos, na mesma ordem de `texts`.
+        """
+        if not texts:
+            return []
+        self.load()
+        import torch
+
+        # Só o corpo é tokenizado por chamada; o cabeçalho (idioma + prompt) vem do cache
+        prefix = self._prefix(language, max_lines, prompt)
+        bodies = self.tokenizer(
+            [t.strip() for t in texts],
             truncation=True,
-        )
-        return out[0]['summary_text'].strip()
+            max_length=max(self.max_input_tokens - len(prefix), 1),
+        )["input_ids"]
+        ids = [prefix + b for b in bodies]
+        # ordena por tamanho para cada lote ser preenchido só até o maior dele
+        order = sorted(range(len(ids)), key=lambda i: len(ids[i]))
+
+        summaries: List[str] = [""] * len(texts)
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                inputs = self.tokenizer.pad(
+                    {"input_ids": [ids[i] for i in idx]}, return_tensors="pt"
+                ).to(self.device)
+                # greedy (sem beam search nem amostragem)
+                out = self.model.generate(
+                    **inputs,
+                    num_beams=1,
+                    do_sample=False,
+                    min_new_tokens=MIN_NEW_TOKENS,
+                    max_new_tokens=MAX_NEW_TOKENS,
+                )
+                decoded = self.tokenizer.batch_decode(out, skip_special_tokens=True)
+                for i, text in zip(idx, decoded):
+                    summaries[i] = text.strip()
+        return summaries
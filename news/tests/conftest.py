@@ -9,11 +9,12 @@ import pytest
 
 @pytest.fixture()
 def temp_db(tmp_path, monkeypatch):
-    # Redireciona o DB para arquivo temporário vazio
+    # Redireciona o DB para arquivo temporário vazio (sem importar o JSON legado)
     from news.storage import repository as repo
-    db_file = tmp_path / "news_db.json"
-    db_file.write_text("[]", encoding="utf-8")
+    db_file = tmp_path / "news.db"
     monkeypatch.setattr(repo, "DB_PATH", str(db_file), raising=True)
+    monkeypatch.setattr(repo, "LEGACY_JSON_PATH", str(tmp_path / "news_db.json"), raising=True)
+    monkeypatch.setattr(repo, "_pending_sentiment", repo.deque(), raising=True)
     return str(db_file)
 
 @pytest.fixture()
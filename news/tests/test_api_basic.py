@@ -34,3 +34,15 @@ def test_last_update(client):
     j = r.json()
     assert j["status"] == "success"
     assert isinstance(j["last_update"], int)
+
+def test_lifespan_closes_tracker_without_scheduler(app, monkeypatch):
+    # worker que não ficou com o scheduler também encerra os recursos do tracker
+    from fastapi.testclient import TestClient
+    from news.api import main as api_main
+    closed = []
+    monkeypatch.setattr(api_main, "_claim_scheduler", lambda: False, raising=True)
+    monkeypatch.setattr(api_main.tracker, "close", lambda: closed.append(True), raising=True)
+    with TestClient(app) as c:
+        assert c.get("/health").status_code == 200
+        assert closed == []
+    assert closed == [True]
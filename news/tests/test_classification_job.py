@@ -21,3 +21,23 @@ def test_classify_pending_news_updates_sentiment(client):
     sentiments = {i.sentiment for i in items}
     assert "Positivo" in sentiments
     assert None not in sentiments
+
+def test_probabilities_returned_as_object(client):
+    topic = "ProbTopic"
+    client.post("/add-topic", params={"topic": topic, "region": "US"})
+
+    from news.storage import repository as repo
+    from datetime import datetime, timezone
+    now = datetime.now(timezone.utc).isoformat()
+    repo.add_news_batch([
+        {"title": "Com prob", "link": "http://x/p1", "published": now, "region": "US", "source": "U", "summary": ""},
+    ], topic, 0)
+
+    from news.api import main as api_main
+    api_main.classify_pending_news()
+
+    # probabilities fica serializado no modelo, mas a API devolve objeto
+    item = repo.get_news_by_topic(topic)[0]
+    assert item.probabilities_dict()["Positivo"] == 0.7
+    data = client.get(f"/news/{topic}/all").json()["data"]
+    assert data[0]["probabilities"]["Positivo"] == 0.7
@@ -0,0 +1,54 @@
+# news/tests/test_feed_gdelt.py
+import logging
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from news.feeds.gdelt import GdeltFeed
+
+CUTOFF = datetime(2026, 10, 14, tzinfo=timezone.utc)
+
+TSV = "\n".join([
+    "https://a.com/1\t2026-10-14T08:02:02Z\t Selic sobe \tValor ",
+    "https://a.com/2\t2026-10-14T09:00:00\tSem Z no fim\tFolha\tcoluna\textra",
+    "https://a.com/3\t2026-10-13T23:59:59Z\tOntem\tG1",
+    "linha curta\tsem campos",
+    "",
+    "https://a.com/4\tnão-é-data\tData inválida\tCNN",
+    "https://a.com/5\t\tSem data\tEstadão",
+    "https://a.com/6\t2026-10-14T10:00:00Z\tTítulo\tcom\ttabs",
+]) + "\n"
+
+
+def _parse(text, **kw):
+    return GdeltFeed("q", **kw)._parse(SimpleNamespace(text=text), CUTOFF)
+
+
+def test_parse_tsv_fields_pubdate_and_cutoff():
+    news = _parse(TSV, region="br")
+    assert [(n["link"], n["title"], n["source"], n["published"]) for n in news] == [
+        ("https://a.com/1", "Selic sobe", "Valor", "2026-10-14T08:02:02+00:00"),
+        ("https://a.com/2", "Sem Z no fim", "Folha", "2026-10-14T09:00:00+00:00"),
+        ("https://a.com/4", "Data inválida", "CNN", None),
+        ("https://a.com/5", "Sem data", "Estadão", None),
+        ("https://a.com/6", "Título", "com", "2026-10-14T10:00:00+00:00"),
+    ]
+    assert all(n["region"] == "BR" and n["summary"] is None for n in news)
+
+
+def test_parse_caps_lines_before_filtering():
+    # max_items limita as linhas lidas (maxrecords da API), não os itens aceitos
+    assert [n["link"] for n in _parse(TSV, max_items=4)] == ["https://a.com/1", "https://a.com/2"]
+
+
+def test_parse_empty_and_undecodable_payloads(caplog):
+    assert _parse("") == []
+    assert _parse("\n\n") == []
+
+    class Broken:
+        @property
+        def text(self):
+            raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+    with caplog.at_level(logging.ERROR):
+        assert GdeltFeed("q")._parse(Broken(), CUTOFF) == []
+    assert "Decode failed" in caplog.text
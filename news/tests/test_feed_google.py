@@ -0,0 +1,80 @@
+# news/tests/test_feed_google.py
+from datetime import datetime, timezone
+
+from news.feeds.google import GoogleNewsFeed
+
+CUTOFF = datetime(2026, 10, 14, tzinfo=timezone.utc)
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>q</title>
+<item>
+  <title>Apple sobe no pré-mercado - Reuters</title>
+  <link> https://news.google.com/a </link>
+  <pubDate>Wed, 14 Oct 2026 15:25:42 GMT</pubDate>
+  <description>&lt;b&gt;resumo&lt;/b&gt;</description>
+</item>
+<item>
+  <title>Ibovespa - abertura - Valor Econômico</title>
+  <link>https://news.google.com/b</link>
+  <pubDate>Wed, 14 Oct 2026 09:00:00 -0300</pubDate>
+</item>
+<item>
+  <title>Sem espaços-Folha</title>
+  <link>https://news.google.com/c</link>
+  <pubDate>Tue, 13 Oct 2026 23:59:59 GMT</pubDate>
+</item>
+<item>
+  <title>Título sem fonte</title>
+  <link></link>
+  <pubDate>data inválida</pubDate>
+</item>
+<item>
+  <title>Volta ao dia anterior no UTC - G1</title>
+  <link>https://news.google.com/d</link>
+  <pubDate>Tue, 13 Oct 2026 22:00:00 -0300</pubDate>
+</item>
+<item>
+  <title>Ontem - CNN</title>
+  <link>https://news.google.com/e</link>
+  <pubDate>Tue, 13 Oct 2026 12:00:00 GMT</pubDate>
+</item>
+</channel></rss>""".encode("utf-8")
+
+
+def test_parse_splits_title_source_and_normalizes_pubdate_to_utc():
+    news = GoogleNewsFeed("q", region="br")._parse(RSS, CUTOFF)
+    assert [(n["title"], n["source"]) for n in news] == [
+        ("Apple sobe no pré-mercado", "Reuters"),
+        ("Ibovespa - abertura", "Valor Econômico"),
+        ("Título sem fonte", ""),
+        ("Volta ao dia anterior no UTC", "G1"),
+    ]
+    assert [n["published"] for n in news] == [
+        "2026-10-14T15:25:42+00:00",
+        "2026-10-14T12:00:00+00:00",
+        None,                            # pubDate ilegível: mantém o item, sem data
+        "2026-10-14T01:00:00+00:00",
+    ]
+    assert [n["link"] for n in news] == [
+        "https://news.google.com/a", "https://news.google.com/b", None, "https://news.google.com/d",
+    ]
+    assert news[0]["summary"] == "<b>resumo</b>"
+    assert news[1]["summary"] is None
+    assert {n["region"] for n in news} == {"BR"}
+
+
+def test_parse_falls_back_to_bare_dash_split():
+    news = GoogleNewsFeed("q")._parse(RSS, datetime(2026, 10, 13, tzinfo=timezone.utc))
+    assert ("Sem espaços", "Folha") in [(n["title"], n["source"]) for n in news]
+
+
+def test_parse_respects_max_items_after_cutoff():
+    news = GoogleNewsFeed("q", max_items=2)._parse(RSS, CUTOFF)
+    assert [n["link"] for n in news] == ["https://news.google.com/a", "https://news.google.com/b"]
+
+
+def test_parse_tolerates_malformed_xml():
+    assert GoogleNewsFeed("q")._parse(b"", CUTOFF) == []
+    truncated = RSS[: RSS.index(b"<item>", RSS.index(b"<item>") + 1) + 40]
+    news = GoogleNewsFeed("q")._parse(truncated, CUTOFF)
+    assert [n["title"] for n in news][:1] == ["Apple sobe no pré-mercado"]
@@ -0,0 +1,86 @@
+# news/tests/test_feed_retry.py
+import asyncio
+
+import httpx
+import pytest
+
+from news.feeds import base
+from news.feeds.google import GoogleNewsFeed
+
+RSS = (b"<rss><channel><item><title>Ok - Fonte</title><link>http://x/1</link>"
+       b"</item></channel></rss>")
+
+
+@pytest.fixture()
+def sleeps(monkeypatch):
+    calls = []
+
+    async def fake_sleep(delay):
+        calls.append(delay)
+
+    monkeypatch.setattr(base.asyncio, "sleep", fake_sleep, raising=True)
+    return calls
+
+
+def _client(responses):
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return responses[min(len(seen), len(responses)) - 1]
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), seen
+
+
+def _get(client):
+    async def run():
+        async with client:
+            return await base.get_with_retry(client, "http://feed.test/rss")
+    return asyncio.run(run())
+
+
+def test_retries_5xx_with_exponential_backoff(sleeps):
+    client, seen = _client([httpx.Response(503), httpx.Response(502), httpx.Response(200, content=b"ok")])
+    resp = _get(client)
+    assert resp.status_code == 200 and len(seen) == 3
+    assert sleeps == [0.3, 0.6]
+
+
+def test_honours_retry_after_and_caps_it(sleeps):
+    client, _ = _client([
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(429, headers={"Retry-After": "3600"}),
+        httpx.Response(200),
+    ])
+    assert _get(client).status_code == 200
+    assert sleeps == [2.0, base.RETRY_AFTER_MAX]
+
+
+def test_gives_up_after_total_and_returns_last_response(sleeps):
+    client, seen = _client([httpx.Response(500)])
+    assert _get(client).status_code == 500
+    assert len(seen) == base.RETRY_TOTAL + 1
+
+
+def test_does_not_retry_other_statuses(sleeps):
+    client, seen = _client([httpx.Response(404)])
+    assert _get(client).status_code == 404 and len(seen) == 1 and sleeps == []
+
+
+def test_retry_after_http_date():
+    assert base._retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert base._retry_after("lixo") is None
+    assert base._retry_after(None) is None
+
+
+def test_google_fetch_async_survives_throttling(sleeps, monkeypatch):
+    monkeypatch.setattr("news.feeds.google.get_redis", lambda: None, raising=True)
+    client, _ = _client([httpx.Response(429, headers={"Retry-After": "1"}), httpx.Response(200, content=RSS)])
+    feed = GoogleNewsFeed("retry-test-query")
+
+    async def run():
+        async with client:
+            return await feed.fetch_async(client, base.today_cutoff())
+
+    news = asyncio.run(run())
+    assert [n["title"] for n in news] == ["Ok"] and sleeps == [1.0]
@@ -1,4 +1,5 @@
 # news/tests/test_news_endpoints.py
+import time
 from datetime import datetime, timedelta, timezone
 
 def _mk_item(title, link, published, region="US", source="UnitTest"):
@@ -82,3 +83,59 @@ def test_mark_read_and_delete(client, monkeypatch):
     # delete de novo -> 404
     r = client.delete("/news/delete", params={"link": "http://x/1"})
     assert r.status_code == 404
+
+def test_news_etag_not_modified(client, monkeypatch):
+    # o ETag inclui o minuto atual: relógio fixo para as requisições não caírem em minutos diferentes
+    from news.api import main as api_main
+    fixed = float(int(time.time()) // 60 * 60 + 1)
+    monkeypatch.setattr(api_main.time, "time", lambda: fixed, raising=True)
+
+    topic = "EtagTopic"
+    client.post("/add-topic", params={"topic": topic, "region": "US"})
+
+    from news.storage import repository as repo
+    now = datetime.now(timezone.utc).isoformat()
+    repo.add_news_batch([_mk_item("E1", "http://x/e1", now)], topic, 0)
+
+    r = client.get(f"/news/{topic}/all")
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+    assert "max-age" in r.headers["Cache-Control"]
+
+    # mesmo conteúdo -> 304 sem corpo
+    r = client.get(f"/news/{topic}/all", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    # escrita no repositório invalida o ETag
+    repo.add_news_batch([_mk_item("E2", "http://x/e2", now)], topic, 0)
+    r = client.get(f"/news/{topic}/all", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert {d["title"] for d in r.json()["data"]} >= {"E1", "E2"}
+
+def test_news_topic_snapshot_follows_add_remove(client):
+    topic = "SnapshotTopic"
+    assert client.get(f"/news/{topic}/all").status_code == 404
+
+    client.post("/add-topic", params={"topic": topic, "region": "US"})
+    assert client.get(f"/news/{topic}/all").status_code == 200
+
+    client.delete("/remove-topic", params={"topic": topic})
+    assert client.get(f"/news/{topic}/fresh").status_code == 404
+
+def test_get_all_news_filters_in_storage(temp_db):
+    from news.storage import repository as repo
+    now = datetime.now(timezone.utc)
+    repo.add_news_batch([
+        _mk_item("Push Fresh", "http://x/pf", now.isoformat()),
+        _mk_item("Push New", "http://x/pn", (now - timedelta(hours=2)).isoformat()),
+        _mk_item("Push Old", "http://x/po", (now - timedelta(hours=8)).isoformat()),
+        _mk_item("Push Sem Data", "http://x/px", None),
+    ], "PushTopic", 0)
+
+    assert [n.title for n in repo.get_all_news(status="fresh")] == ["Push Fresh"]
+    assert [n.title for n in repo.get_all_news(status="new")] == ["Push New"]
+    assert {n.title for n in repo.get_all_news(status="old")} == {"Push Old", "Push Sem Data"}
+    since = now - timedelta(hours=3)
+    assert {n.title for n in repo.get_all_news(since=since)} == {"Push Fresh", "Push New"}
+    raw = repo.get_all_news_raw(status="fresh")
+    assert [(d["title"], d["status"]) for d in raw] == [("Push Fresh", "fresh")]
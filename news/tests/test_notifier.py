@@ -0,0 +1,142 @@
+# news/tests/test_notifier.py
+from datetime import datetime, timezone
+
+import pytest
+
+from news.notifier import news_notifier as nn
+
+NOW = datetime(2026, 10, 14, 12, 0, tzinfo=timezone.utc)
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW if tz else NOW.replace(tzinfo=None)
+
+
+@pytest.fixture(autouse=True)
+def frozen_now(monkeypatch):
+    monkeypatch.setattr(nn, "datetime", _FrozenDatetime, raising=True)
+
+
+def _n(title, published, status="fresh", **kw):
+    return {"title": title, "published": published, "status": status, "link": kw.pop("link", None), **kw}
+
+
+# ---------- collect_fresh_news ----------
+ITEMS = [
+    _n("a", "2026-10-14T11:00:00+00:00"),
+    _n("b", "2026-10-14T11:30:00+00:00"),
+    _n("c", "2026-10-14T09:00:00+00:00"),                 # fora da janela de 2h
+    _n("d", "2026-10-14T11:45:00+00:00", status="new"),   # não é fresh
+    _n("e", "2026-10-14T11:00:00"),                       # naive -> UTC, empata com "a"
+    _n("f", None),
+    _n("g", "lixo"),
+    _n("h", "2026-10-14T11:50:00+00:00"),
+]
+
+
+def test_collect_fresh_news_sorts_newest_first_and_keeps_ties_stable():
+    notifier = nn.Notifier(lambda: ITEMS)
+    assert [i["title"] for i in notifier.collect_fresh_news()] == ["h", "b", "a", "e"]
+
+
+def test_collect_fresh_news_limit_uses_same_order_as_full_sort():
+    notifier = nn.Notifier(lambda: ITEMS)
+    full = [i["title"] for i in notifier.collect_fresh_news()]
+    for k in range(len(full) + 2):
+        assert [i["title"] for i in notifier.collect_fresh_news(limit=k)] == full[:k]
+
+
+def test_collect_fresh_news_passes_filters_to_capable_provider():
+    calls = []
+
+    def provider(status=None, since=None):
+        calls.append((status, since))
+        return ITEMS
+
+    got = nn.Notifier(provider).collect_fresh_news(hours=1)
+    assert calls == [("fresh", datetime(2026, 10, 14, 11, 0, tzinfo=timezone.utc))]
+    assert [i["title"] for i in got] == ["h", "b", "a", "e"]
+
+
+# ---------- render_email_html ----------
+def test_sentiment_chip_mapping():
+    assert nn._sentiment_chip("Positivo") is nn._CHIP_POS
+    assert nn._sentiment_chip(" positive ") is nn._CHIP_POS
+    assert nn._sentiment_chip("NEGATIVO") is nn._CHIP_NEG
+    assert nn._sentiment_chip("Neutro") is nn._CHIP_NEU
+    assert nn._sentiment_chip("") is nn._CHIP_NEU
+    assert nn._sentiment_chip(None) is nn._CHIP_NEU
+
+
+def test_escape_columns_falls_back_when_field_contains_separator():
+    cols = (["a<b", "x\x1fy"], ["&"], [])
+    assert nn._escape_columns(*cols) == [["a&lt;b", "x\x1fy"], ["&amp;"], []]
+    assert nn._escape_columns(["<i>"], ["'\""]) == [["&lt;i&gt;"], ["&#x27;&quot;"]]
+
+
+def test_render_email_html_empty():
+    assert nn.Notifier(list).render_email_html([]) == (
+        "<p style='font-family:Segoe UI,Arial,sans-serif;font-size:14px'>Sem notícias fresh na janela.</p>"
+    )
+
+
+def test_render_email_html_golden():
+    items = [
+        {"title": "Selic <sobe> & dólar cai", "link": "https://www.valor.com.br/a?x=1&y='2'",
+         "source": "Valor", "sentiment": "Positivo", "published": "2026-10-14T11:55:00+00:00",
+         "topic": "Juros", "region": "br"},
+        {"title": "Sem fonte\x1f nem link", "link": None, "source": None, "sentiment": "",
+         "published": "2026-10-14T09:00:00+00:00", "topic": "Juros", "region": "BR"},
+        {"title": "Ações caem", "link": "http://g1.com/b", "source": "G1", "sentiment": "negativo",
+         "published": None, "topic": "Bolsa & Cia"},
+    ]
+    got = nn.Notifier(list).render_email_html(items, window_hours=3, max_per_topic=1)
+    expected = (
+        "<div style='font-family:Segoe UI,Arial,sans-serif;font-size:14px;color:#212529'>"
+        "<h2 style='margin:0 0 12px'>News Tracker — Fresh (últimas 3h)</h2>"
+        "<div style='margin:0 0 12px;color:#6c757d'>Total: 3 item(s)</div>"
+        "<h3 style='margin:18px 0 6px;border-top:1px solid #dee2e6;padding-top:10px'>"
+        "BR — Juros <span style='color:#6c757d;font-weight:normal'>(2)</span></h3>"
+        "<table role='presentation' cellspacing='0' cellpadding='0' border='0' "
+        "style='width:100%;border-collapse:collapse;margin:0 0 8px'>"
+        "<tr><td valign='top' style='width:18px;padding:6px 6px 6px 0'>•</td>"
+        "<td valign='top' style='padding:6px 0'>"
+        "<div style='margin:0 0 2px'><a href='https://www.valor.com.br/a?x=1&amp;y=&#x27;2&#x27;' "
+        "style='color:#0d6efd;text-decoration:none;'>Selic &lt;sobe&gt; &amp; dólar cai</a></div>"
+        "<div style='font-size:12px;color:#6c757d'>Valor — valor.com.br — " + nn._CHIP_POS
+        + " — 5 min atrás — 2026-10-14T11:55:00+00:00</div>"
+        "</td></tr>"
+        "</table>"
+        "<div style='font-size:12px;color:#6c757d;margin:-4px 0 8px'>+1 item(s) não exibidos…</div>"
+        "<h3 style='margin:18px 0 6px;border-top:1px solid #dee2e6;padding-top:10px'>"
+        "GLOBAL — Bolsa &amp; Cia <span style='color:#6c757d;font-weight:normal'>(1)</span></h3>"
+        "<table role='presentation' cellspacing='0' cellpadding='0' border='0' "
+        "style='width:100%;border-collapse:collapse;margin:0 0 8px'>"
+        "<tr><td valign='top' style='width:18px;padding:6px 6px 6px 0'>•</td>"
+        "<td valign='top' style='padding:6px 0'>"
+        "<div style='margin:0 0 2px'><a href='http://g1.com/b' "
+        "style='color:#0d6efd;text-decoration:none;'>Ações caem</a></div>"
+        "<div style='font-size:12px;color:#6c757d'>G1 — g1.com — " + nn._CHIP_NEG + "</div>"
+        "</td></tr>"
+        "</table>"
+        "</div>"
+    )
+    assert got == expected
+
+
+def test_render_email_html_escapes_per_field_when_separator_present():
+    items = [
+        {"title": "T\x1f<1>", "link": None, "source": "S&P", "sentiment": "Neutro",
+         "published": "2026-10-14T10:00:00+00:00", "topic": "X", "region": "US"},
+        {"title": "<2>", "link": "http://a.com/", "source": None, "sentiment": None,
+         "published": "2026-10-12T11:00:00+00:00", "topic": "X", "region": "US"},
+    ]
+    got = nn.Notifier(list).render_email_html(items)
+    assert ">T\x1f&lt;1&gt;</a>" in got
+    assert "<a href='#'" in got
+    assert "S&amp;P — " + nn._CHIP_NEU + " — 2 h atrás — 2026-10-14T10:00:00+00:00</div>" in got
+    assert ">&lt;2&gt;</a>" in got
+    assert "'> — a.com — 2 d atrás — 2026-10-12T11:00:00+00:00</div>" in got
+    assert "(últimas 2h)" in got
@@ -0,0 +1,192 @@
+# news/tests/test_tracker.py
+import asyncio
+import random
+
+import numpy as np
+import pytest
+import xxhash
+from datasketch import MinHash
+
+from news.feeds.base import BaseFeed
+from news.tracker import news_tracker as nt
+
+
+class FakeFeed(BaseFeed):
+    """Feed em memória: devolve sempre os mesmos itens (ou levanta `error`)."""
+
+    def __init__(self, items=None, error=None):
+        self.items = items or []
+        self.error = error
+        self.verify = True
+
+    def fetch(self, cutoff=None):
+        if self.error:
+            raise self.error
+        return [dict(i) for i in self.items]
+
+
+def _item(n, published=None, title=None, summary=""):
+    return {
+        "title": title or f"Manchete {n} " + " ".join(f"termo{n}x{k}" for k in range(10)),
+        "link": f"http://x/{n}",
+        "published": published or f"2026-10-14T{n % 24:02d}:00:00+00:00",
+        "summary": summary,
+    }
+
+
+@pytest.fixture()
+def tracker(monkeypatch):
+    # sem Redis (dedup só em memória) mesmo que o .env defina REDIS_URL
+    monkeypatch.setattr(nt, "get_redis", lambda: None, raising=True)
+    t = nt.NewsTracker()
+    t.add_topic("T")
+    yield t
+    t.close()
+
+
+def test_rejects_seen_links_identical_content_and_near_duplicates(tracker):
+    base = "Banco Central mantém a Selic em dez e meio por cento pela terceira reunião seguida diz comunicado"
+    first = tracker._ingest("T", [_item(1, title=base)])
+    assert [i["link"] for i in first] == ["http://x/1"]
+
+    again = [
+        _item(1, title="link repetido com outro conteúdo"),            # link já visto
+        dict(_item(2, title=base), link="http://x/2"),                  # conteúdo idêntico
+        dict(_item(3, title=base + " oficial"), link="http://x/3"),     # quase igual (LSH)
+        _item(4),                                                       # novo
+    ]
+    fresh = tracker._ingest("T", again)
+    assert [i["link"] for i in fresh] == ["http://x/4"]
+
+
+def test_near_duplicates_inside_one_batch(tracker):
+    base = "Petrobras anuncia plano de investimentos com foco em pré-sal e transição energética até 2030"
+    fresh = tracker._ingest("T", [_item(1, title=base), _item(2, title=base + " hoje"), _item(3)])
+    assert [i["link"] for i in fresh] == ["http://x/1", "http://x/3"]
+
+
+def test_items_come_out_newest_first(tracker):
+    items = [_item(n, published=f"2026-10-14T{h:02d}:00:00+00:00") for n, h in enumerate([5, 23, 1, 12])]
+    items.append(dict(_item(9), published=None))  # sem data: vai para o fim
+    tracker.feeds["T"] = [FakeFeed(items)]
+
+    last = tracker.update_topic("T", limit=3)
+    assert [i["link"] for i in last] == ["http://x/1", "http://x/3", "http://x/0"]
+    stored = tracker.get_all_news("T")
+    assert [i["link"] for i in stored] == ["http://x/1", "http://x/3", "http://x/0", "http://x/2", "http://x/9"]
+    assert tracker._neg_pub_ts["T"] == [-i["_pub_ts"] for i in stored]
+
+
+def test_prune_keeps_every_index_in_lockstep(tracker, monkeypatch):
+    monkeypatch.setattr(nt, "_MAX_ITEMS_PER_TOPIC", 5, raising=True)
+    for r in range(3):
+        batch = [_item(r * 10 + i, published=f"2026-10-14T{r:02d}:{i:02d}:00+00:00") for i in range(4)]
+        tracker._finalize_topic("T", tracker._ingest("T", batch), limit=10)
+
+    kept = tracker.all_news["T"]
+    assert len(kept) == 5
+    assert [i["_pub_ts"] for i in kept] == sorted((i["_pub_ts"] for i in kept), reverse=True)
+    assert len(tracker._neg_pub_ts["T"]) == 5
+    assert set(tracker.minhashes["T"]) == {i["_id"] for i in kept}
+    assert len(tracker.seen_links["T"]) == 5
+    assert len(tracker.content_hashes["T"]) == 5
+    lsh = tracker.lsh_index["T"]
+    assert all(lsh.keys.has_key(i["_id"]) for i in kept)
+    assert lsh.keys.size() == 5
+
+
+def test_vectorized_sketch_matches_datasketch(tracker, monkeypatch):
+    monkeypatch.setattr(nt, "RMinHash", None, raising=True)  # força o caminho NumPy
+    for text in ["Ação da Petrobras sobe 5% após balanço", "a b c d a b", "x" * 10 + " y", ""]:
+        ref = MinHash(num_perm=nt._NUM_PERM, seed=1, scheme="legacy",
+                      hashfunc=lambda b: xxhash.xxh32_intdigest(b))
+        ref.update_batch([t.encode("utf-8") for t in text.lower().split()[:nt._MAX_TOKENS]])
+        assert np.array_equal(tracker._build_minhash(text).hashvalues, ref.hashvalues), text
+
+
+def test_sketch_cache_reuses_normalized_text(tracker):
+    a = tracker._build_minhash("Mercado Fecha em Alta")
+    assert tracker._build_minhash("mercado fecha em alta") is a
+
+
+def test_lsh_hits_matches_query(tracker):
+    rng = random.Random(7)
+    words = [f"w{i}" for i in range(40)]
+    docs = [" ".join(rng.sample(words, 25)) for _ in range(120)]
+    tracker._ingest("T", [{"link": f"l{i}", "title": d, "summary": ""} for i, d in enumerate(docs[:60])])
+    lsh = tracker.lsh_index["T"]
+    sketches = [tracker._build_minhash(d + " extra") for d in docs]
+    expected = [bool(lsh.query(m)) for m in sketches]
+    assert nt._lsh_hits(lsh, np.vstack([m.hashvalues for m in sketches])) == expected
+    assert any(expected) and not all(expected)
+
+
+def test_update_all_async_ingests_per_topic_and_survives_feed_errors(tracker):
+    tracker.add_topic("U")
+    tracker.feeds["T"] = [FakeFeed([_item(1), _item(2)]), FakeFeed(error=RuntimeError("boom"))]
+    tracker.feeds["U"] = [FakeFeed([_item(3)])]
+
+    asyncio.run(tracker.update_all_async())
+    assert {i["link"] for i in tracker.get_last_news("T")} == {"http://x/1", "http://x/2"}
+    assert [i["link"] for i in tracker.get_last_news("U")] == ["http://x/3"]
+    assert tracker.last_updated is not None
+
+    # segundo refresh com os mesmos itens: nada novo
+    asyncio.run(tracker.update_all_async())
+    assert tracker.get_last_news("T") == [] and tracker.get_last_news("U") == []
+
+
+def test_redis_lsh_cleanup_is_scoped_to_one_topic(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    import datasketch.storage as ds_storage
+
+    server = fakeredis.FakeServer()
+
+    class FakeRedis(fakeredis.FakeRedis):
+        def __init__(self, *a, **k):
+            for opt in ("host", "port", "db", "password", "username", "ssl", "unix_socket_path"):
+                k.pop(opt, None)
+            super().__init__(*a, server=server, **k)
+
+    client = FakeRedis()
+    monkeypatch.setattr(ds_storage.redis, "Redis", FakeRedis, raising=True)
+    monkeypatch.setattr(nt, "get_redis", lambda: client, raising=True)
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+    monkeypatch.setenv("LSH_STORAGE", "redis")
+
+    t = nt.NewsTracker()
+    try:
+        t.add_topic("A")
+        t.add_topic("A:B")  # "lsh:A:" seria prefixo das chaves de "A:B"
+        t._ingest("A", [_item(1)])
+        t._ingest("A:B", [_item(2)])
+        keys_ab = set(client.scan_iter(match=nt._lsh_prefix("A:B") + b"*"))
+        assert keys_ab
+
+        # virada de dia em "A": apaga só os dias antigos de "A"
+        stale = nt._lsh_prefix("A") + b"20000101_keys"
+        client.set(stale, 1)
+        monkeypatch.setattr(nt, "_lsh_day", lambda off=0: "20991231" if off == 0 else "20991230")
+        t._ingest("A", [_item(3)])
+        assert not client.exists(stale)
+        assert keys_ab <= set(client.scan_iter(match=b"lsh:*"))
+
+        assert t.remove_topic("A")
+        assert not list(client.scan_iter(match=nt._lsh_prefix("A") + b"*"))
+        assert keys_ab <= set(client.scan_iter(match=b"lsh:*"))
+    finally:
+        t.close()
+
+
+def test_thread_pools_are_created_lazily(tracker):
+    assert tracker._fetch_pool is None and tracker._topic_pool is None
+    asyncio.run(tracker.update_all_async())
+    assert tracker._fetch_pool is None  # caminho async não usa threads
+
+    tracker.feeds["T"] = [FakeFeed([_item(1)]), FakeFeed([_item(2)])]
+    tracker.update_all()
+    assert {i["link"] for i in tracker.get_last_news("T")} == {"http://x/1", "http://x/2"}
+    pools = tracker._pools()
+    assert tracker._pools() == pools  # reaproveitados entre refreshes
+    tracker.close()
+    assert tracker._fetch_pool is None and tracker._topic_pool is None
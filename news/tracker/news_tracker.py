@@ -1,29 +1,194 @@
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime, timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import AsyncExitStack
 from threading import Lock
-from news.feeds.base import BaseFeed
-from news.feeds import GoogleNewsFeed, GdeltFeed
-from datasketch import MinHash, MinHashLSH
+import bisect
+import hashlib
+import itertools
+import inspect
+import os
+import re
+from news.feeds.base import BaseFeed, today_cutoff
+from news.feeds import GoogleNewsFeed, GdeltFeed, make_async_client
+from news.utils.log_utils import get_logger
+from news.utils.redis_utils import get_redis
+from datasketch import LeanMinHash, MinHash, MinHashLSH
+import numpy as np
+import xxhash
+
+try:  # opcional: MinHash em Rust (SIMD); sem o pacote fica o caminho NumPy abaixo
+    from rensa import RMinHash
+except ImportError:
+    RMinHash = None
+import asyncio
 import time
 
+logger = get_logger(__name__)
+
 _MAX_ITEMS_PER_TOPIC = 500  # poda de memória para não crescer indefinidamente
 _NUM_PERM = 128
 _LSH_THRESHOLD = 0.8
-_MAX_FETCH_WORKERS = 8      # paralelismo por tópico
+_MAX_TOKENS = 64            # tokens por item considerados no MinHash
+_MINHASH_SEED = 1
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Tabela (a, b) das permutações, a mesma do MinHash "legacy" do datasketch (seed 1):
+# calculada uma vez e aplicada a todos os tokens de um item numa expressão NumPy
+_PERM_A, _PERM_B = MinHash(num_perm=_NUM_PERM, seed=_MINHASH_SEED, scheme="legacy").permutations
+_EMPTY_HASHVALUES = np.full(_NUM_PERM, _MAX_HASH, dtype=np.uint64)
+_SKETCH_CACHE_MAX = 4096  # sketches (~1 KiB cada) por blake2b do texto normalizado
+# versões recentes do datasketch aceitam `hashfunc`; nas antigas a chave de banda é trocada na instância
+_LSH_HAS_HASHFUNC = "hashfunc" in inspect.signature(MinHashLSH.__init__).parameters
+_MAX_FETCH_WORKERS = 8      # fetches simultâneos (pool compartilhado pelos tópicos)
 _MAX_TOPIC_WORKERS = 4      # paralelismo entre tópicos
+_SEEN_TTL_SEC = 2 * 24 * 3600  # feeds só trazem itens do dia; 2 dias de dedup no Redis bastam
+_REDIS_LAST_FETCHED = "last_fetched"  # hash topic -> ts do último fetch
+
+def _band_key(band: bytes) -> bytes:
+    # chave de 8 bytes por banda em vez dos r * 8 bytes crus das hashvalues
+    return xxhash.xxh64_digest(band)
+
+
+def _link_key(link: str) -> int:
+    # 64 bits por link em vez da URL inteira; colisão é desprezível para ~500 itens/tópico
+    return xxhash.xxh3_64_intdigest(link.encode("utf-8"))
+
+
+def _published_ts(publ: Optional[str]) -> float:
+    # published é ISO (UTC) vindo dos feeds; sem data (ou inválida) vai para o fim da lista
+    if not publ:
+        return 0.0
+    try:
+        dt = datetime.fromisoformat(publ)
+    except ValueError:
+        return 0.0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _newest_first(item: Dict) -> float:
+    return -item["_pub_ts"]
+
+
+def _content_digest(item: Dict) -> bytes:
+    return hashlib.sha1(f"{item.get('title', '')}|{item.get('summary', '')}".encode("utf-8")).digest()
+
+
+def _new_lsh(storage_config: Optional[Dict] = None) -> MinHashLSH:
+    kwargs = {"storage_config": storage_config} if storage_config else {}
+    if _LSH_HAS_HASHFUNC:
+        return MinHashLSH(threshold=_LSH_THRESHOLD, num_perm=_NUM_PERM, hashfunc=_band_key, **kwargs)
+    lsh = MinHashLSH(threshold=_LSH_THRESHOLD, num_perm=_NUM_PERM, **kwargs)
+    lsh._H = lambda hs: _band_key(bytes(hs.byteswap().data))
+    return lsh
+
+
+def _redis_kwargs(url: str) -> Dict:
+    """
+    Kwargs de `redis.Redis(...)` para a URL: é assim que o storage do datasketch cria
+    o cliente, e o `connection_class` devolvido pelo parse_url não é aceito ali.
+    """
+    from redis.connection import SSLConnection, UnixDomainSocketConnection, parse_url
+
+    kwargs = parse_url(url)
+    conn_cls = kwargs.pop("connection_class", None)
+    if conn_cls is not None and issubclass(conn_cls, SSLConnection):
+        kwargs["ssl"] = True  # rediss://
+    elif conn_cls is not None and issubclass(conn_cls, UnixDomainSocketConnection):
+        kwargs["unix_socket_path"] = kwargs.pop("path")  # unix://
+    return kwargs
+
+
+def _lsh_day(day_offset: int = 0) -> str:
+    # mesmo "dia" do cutoff dos feeds (UTC): eles só trazem itens de hoje
+    return (today_cutoff() + timedelta(days=day_offset)).strftime("%Y%m%d")
+
+
+_LSH_DAY_RE = re.compile(rb"(\d{8})_")
+
+
+def _lsh_prefix(topic: str) -> bytes:
+    # hash de tamanho fixo do tópico: o prefixo de um tópico nunca é prefixo do de outro
+    # (ex.: "A" e "A:B") e não tem '*', '?', '[' nem '_' no nome das chaves
+    return b"lsh:" + hashlib.blake2b(topic.encode("utf-8"), digest_size=8).hexdigest().encode("ascii") + b":"
+
+
+def _lsh_hits(lsh: MinHashLSH, hashvalues: np.ndarray) -> List[bool]:
+    """
+    Equivale a `bool(lsh.query(m))` para cada linha de `hashvalues` (N x num_perm):
+    o byteswap e o recorte das bandas são feitos no NumPy para o lote todo, e sobra
+    em Python só o hash de 8 bytes e o lookup em cada tabela de banda.
+    """
+    n = len(hashvalues)
+    hits = [False] * n
+    swapped = hashvalues.byteswap()  # mesma ordem de bytes do MinHashLSH._byteswap
+    for (start, end), table in zip(lsh.hashranges, lsh.hashtables):
+        width = (end - start) * swapped.itemsize
+        raw = np.ascontiguousarray(swapped[:, start:end]).tobytes()
+        for i in range(n):
+            if not hits[i] and table.get(_band_key(raw[i * width:(i + 1) * width])):
+                hits[i] = True
+    return hits
+
 
 class NewsTracker:
     def __init__(self):
         # Cada tópico pode ter vários feeds
         self.feeds: Dict[str, List[BaseFeed]] = {}
+        # mantida ordenada por published desc a cada inserção (bisect, sem sort por update);
+        # _neg_pub_ts[topic] é a lista paralela de chaves (-_pub_ts, crescente)
         self.all_news: Dict[str, List[Dict]] = {}
-        self.seen_links: Dict[str, Set[str]] = {}
+        self._neg_pub_ts: Dict[str, List[float]] = {}
+        self.seen_links: Dict[str, Set[int]] = {}  # xxh3_64 dos links já ingeridos
         self.last_fetched: Dict[str, List[Dict]] = {}
         self.last_updated = None
         self.lsh_index: Dict[str, MinHashLSH] = {}
-        self.minhashes: Dict[str, Dict[int, MinHash]] = {}
-        self._next_id = 0
-        self._lock = Lock()  # protege _next_id e estruturas por conta de threads
+        # só LeanMinHash (seed + hashvalues): a tabela de permutações fica nas constantes
+        # do módulo e nunca é copiada por sketch
+        self.minhashes: Dict[str, Dict[int, LeanMinHash]] = {}
+        # sha1 de "título|summary": repost idêntico é descartado sem montar o MinHash
+        self.content_hashes: Dict[str, Set[bytes]] = {}
+        self._sketch_cache: Dict[bytes, LeanMinHash] = {}
+        # Lock por tópico: tópicos atualizados em paralelo (update_all) não disputam a
+        # mesma seção crítica. Ids vêm de um itertools.count (next() é atômico sob o GIL).
+        self._topic_locks: Dict[str, Lock] = {}
+        self._lsh_days: Dict[str, str] = {}  # dia (AAAAMMDD) do namespace do LSH no Redis
+        # Com REDIS_URL, o dedup por link é compartilhado entre processos (SADD atômico)
+        self._redis = get_redis()
+        # LSH_STORAGE=redis guarda o índice LSH no Redis (REDIS_URL), compartilhado entre
+        # processos; padrão "memory". Lido aqui (não no import) para valer o .env da API.
+        # Só com cliente válido; sem ele cai no índice em memória
+        lsh_storage = os.getenv("LSH_STORAGE", "memory").lower()
+        self._lsh_redis = lsh_storage == "redis" and self._redis is not None
+        if lsh_storage == "redis" and not self._lsh_redis:
+            logger.warning("LSH_STORAGE=redis sem Redis disponível. Usando LSH em memória.")
+        # com o LSH no Redis os ids sobrevivem ao processo: base aleatória por instância
+        # para não colidir com os de outros workers/reinícios
+        self._id_counter = itertools.count(int.from_bytes(os.urandom(5), "big") << 24 if self._lsh_redis else 0)
+        # Pools persistentes do caminho síncrono (update_topic/update_all), criados no primeiro
+        # uso: a API atualiza por update_all_async e não paga threads ociosas em cada worker.
+        # São dois: os jobs do pool de tópicos submetem no de fetch, nunca no próprio pool.
+        self._pools_lock = Lock()
+        self._fetch_pool: Optional[ThreadPoolExecutor] = None
+        self._topic_pool: Optional[ThreadPoolExecutor] = None
+
+    def _pools(self) -> Tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+        """(pool de fetch, pool de tópicos), criados sob demanda e reaproveitados entre refreshes."""
+        with self._pools_lock:
+            if self._fetch_pool is None:
+                self._fetch_pool = ThreadPoolExecutor(max_workers=_MAX_FETCH_WORKERS, thread_name_prefix="fetch")
+                self._topic_pool = ThreadPoolExecutor(max_workers=_MAX_TOPIC_WORKERS, thread_name_prefix="topic")
+            return self._fetch_pool, self._topic_pool
+
+    def close(self):
+        """Encerra os pools de threads do tracker (se chegaram a ser criados)."""
+        with self._pools_lock:
+            pools, self._fetch_pool, self._topic_pool = (self._topic_pool, self._fetch_pool), None, None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=True)
 
     def add_topic(self, topic: str, max_items=20, verify=False, region="US"):
         if topic in self.feeds:
@@ -33,93 +198,337 @@ class NewsTracker:
         # gdelt_feed = GdeltFeed(topic, max_items, verify, region)
         self.feeds[topic] = [google_feed]
         self.all_news[topic] = []
+        self._neg_pub_ts[topic] = []
         self.seen_links[topic] = set()
         self.last_fetched[topic] = []
-        self.lsh_index[topic] = MinHashLSH(threshold=_LSH_THRESHOLD, num_perm=_NUM_PERM)
+        self.lsh_index[topic] = self._make_lsh(topic)
         self.minhashes[topic] = {}
+        self.content_hashes[topic] = set()
+        self._topic_locks[topic] = Lock()
+
+    def remove_topic(self, topic: str) -> bool:
+        if topic not in self.feeds:
+            return False
+        for store in (self.feeds, self.all_news, self.seen_links, self.last_fetched,
+                      self.lsh_index, self.minhashes, self.content_hashes,
+                      self._neg_pub_ts, self._topic_locks, self._lsh_days):
+            store.pop(topic, None)
+        if self._redis is not None:
+            try:
+                self._redis.delete(self._seen_key(topic))
+                self._redis.hdel(_REDIS_LAST_FETCHED, topic)
+            except Exception as e:
+                logger.warning("Redis cleanup falhou para '%s': %s", topic, e)
+            if self._lsh_redis:
+                self._drop_lsh_days(topic, keep=())
+        return True
+
+    # ---------- LSH no Redis (LSH_STORAGE=redis) ----------
+    # O índice de cada tópico vive em lsh:<hash do tópico>:<AAAAMMDD>_* e troca de namespace na
+    # virada do dia (UTC), como o cutoff dos feeds. Dias anteriores a ontem são apagados
+    # na troca: o Redis fica limitado a ~2 dias de sketches (como o seen:<tópico>) mesmo
+    # com entradas de processos que já morreram, e manchete recorrente não fica
+    # bloqueada indefinidamente por um sketch antigo.
+
+    def _make_lsh(self, topic: str) -> MinHashLSH:
+        if not self._lsh_redis:
+            return _new_lsh()
+        day = _lsh_day()
+        self._lsh_days[topic] = day
+        return _new_lsh({
+            "type": "redis",
+            "redis": _redis_kwargs(os.environ["REDIS_URL"]),
+            "basename": _lsh_prefix(topic) + day.encode("ascii"),
+        })
+
+    def _rotate_lsh(self, topic: str) -> None:
+        if not self._lsh_redis or self._lsh_days.get(topic) == _lsh_day():
+            return
+        with self._topic_locks[topic]:
+            if self._lsh_days.get(topic) == _lsh_day():
+                return
+            self.lsh_index[topic] = self._make_lsh(topic)
+            # os ids locais eram do índice de ontem; os itens deles saem na poda normal
+            self.minhashes[topic] = {}
+        self._drop_lsh_days(topic, keep=(_lsh_day(), _lsh_day(-1)))
+
+    def _drop_lsh_days(self, topic: str, keep: Tuple[str, ...]) -> None:
+        prefix = _lsh_prefix(topic)
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for key in self._redis.scan_iter(match=prefix + b"*", count=1000):
+                # só chaves do layout <prefixo><AAAAMMDD>_... deste tópico
+                m = _LSH_DAY_RE.match(key, len(prefix))
+                if m and m.group(1).decode("ascii") not in keep:
+                    pipe.delete(key)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Limpeza do LSH no Redis falhou para '%s': %s", topic, e)
+
+    @staticmethod
+    def _seen_key(topic: str) -> str:
+        return f"seen:{topic}"
 
-    def _build_minhash(self, text: str) -> MinHash:
+    def _claim_links(self, topic: str, links: List[str]) -> Optional[Set[str]]:
+        """
+        SADD em lote no Redis: devolve os links que este processo viu primeiro
+        (os demais já foram ingeridos por outro worker). None = sem Redis/erro.
+        """
+        if self._redis is None or not links:
+            return None
+        key = self._seen_key(topic)
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for link in links:
+                pipe.sadd(key, link)
+            pipe.expire(key, _SEEN_TTL_SEC)
+            added = pipe.execute()[:-1]
+        except Exception as e:
+            logger.warning("Redis dedup indisponível para '%s': %s", topic, e)
+            return None
+        return {link for link, ok in zip(links, added) if ok}
+
+    def _build_minhash(self, text: str) -> LeanMinHash:
         # Barato e estável: lower + split. Limita tokens para reduzir custo.
-        m = MinHash(num_perm=_NUM_PERM)
-        if text:
-            for token in text.lower().split()[:64]:
-                m.update(token.encode("utf-8"))
+        # Tokeniza em bytes (um encode por texto, não por token); ASCII nem passa pelo
+        # lower Unicode. Com rensa o sketch sai do Rust; senão, um xxh32 por token e as
+        # 128 permutações de uma vez no NumPy.
+        if not text:
+            return LeanMinHash(seed=_MINHASH_SEED, hashvalues=_EMPTY_HASHVALUES, scheme="legacy")
+        raw = text.encode("utf-8").lower() if text.isascii() else text.lower().encode("utf-8")
+        # mesmo texto normalizado (retry/polls sobrepostos) reaproveita o sketch pronto
+        ckey = hashlib.blake2b(raw, digest_size=16).digest()
+        cache = self._sketch_cache
+        try:
+            return cache[ckey]
+        except KeyError:
+            pass
+
+        tokens = raw.split(None, _MAX_TOKENS)[:_MAX_TOKENS]
+        if tokens and RMinHash is not None:
+            # mesmo backend para todos os sketches do processo (escolhido no import)
+            rm = RMinHash(num_perm=_NUM_PERM, seed=_MINHASH_SEED)
+            rm.update(tokens)
+            hashvalues = np.asarray(rm.digest(), dtype=np.uint64)
+        elif tokens:
+            hv = np.fromiter((xxhash.xxh32_intdigest(t) for t in tokens), dtype=np.uint64, count=len(tokens))
+            hashvalues = (((np.outer(hv, _PERM_A) + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH).min(axis=0)
+        else:
+            hashvalues = _EMPTY_HASHVALUES
+        m = LeanMinHash(seed=_MINHASH_SEED, hashvalues=hashvalues, scheme="legacy")
+        if len(cache) >= _SKETCH_CACHE_MAX:
+            cache.clear()
+        cache[ckey] = m
         return m
 
     def _prune_topic_memory(self, topic: str):
         # Poda para manter no máx. N itens por tópico (evita crescimento sem limite)
-        lst = self.all_news.get(topic, [])
-        if len(lst) > _MAX_ITEMS_PER_TOPIC:
-            # mantém mais recentes (já ordenado por published desc no fluxo)
-            self.all_news[topic] = lst[:_MAX_ITEMS_PER_TOPIC]
-
-    def update_topic(self, topic: str, limit: int = 10) -> List[Dict]:
-        feeds = self.feeds.get(topic, [])
-        if not feeds:
-            return []
+        lst = self.all_news.get(topic)
+        if lst is None or len(lst) <= _MAX_ITEMS_PER_TOPIC:
+            return
+        seen, hashes, minhashes = self.seen_links[topic], self.content_hashes[topic], self.minhashes[topic]
+        # tudo sob o lock do tópico: as duas listas paralelas são cortadas juntas
+        with self._topic_locks[topic]:
+            # mantém mais recentes (a lista já está em published desc)
+            evicted = lst[_MAX_ITEMS_PER_TOPIC:]
+            del lst[_MAX_ITEMS_PER_TOPIC:]
+            del self._neg_pub_ts[topic][_MAX_ITEMS_PER_TOPIC:]
+            # índices de dedup podados junto: só os itens que saíram (O(evictados))
+            with self.lsh_index[topic].deletion_session() as session:
+                for item in evicted:
+                    item_id = item.get("_id")
+                    if minhashes.pop(item_id, None) is not None:
+                        session.remove(item_id)
+                    if item.get("link"):
+                        seen.discard(_link_key(item["link"]))
+                    hashes.discard(_content_digest(item))
 
+    def _ingest(self, topic: str, fetched: List[Dict]) -> List[Dict]:
+        """Deduplica (link + MinHash/LSH) e indexa os itens de um feed; retorna os novos."""
         fresh: List[Dict] = []
+        seen = self.seen_links[topic]
+        hashes = self.content_hashes[topic]
+        self._rotate_lsh(topic)
+        lsh = self.lsh_index[topic]
+        pending: List[LeanMinHash] = []  # sketches aceitos neste lote, ainda fora do LSH
+        news, neg_ts = self.all_news[topic], self._neg_pub_ts[topic]
+        # dedupe simples por link (local e, com Redis, entre processos)
+        candidates = []
+        for item in fetched:
+            link = item.get("link")
+            if link:
+                key = _link_key(link)
+                if key not in seen:
+                    candidates.append((item, link, key))
+        claimed = self._claim_links(topic, [link for _, link, _ in candidates])
 
-        # Busca feeds em paralelo (melhor latência por tópico)
-        with ThreadPoolExecutor(max_workers=min(len(feeds), _MAX_FETCH_WORKERS)) as ex:
-            futures = [ex.submit(feed.fetch) for feed in feeds]
-            for fut in as_completed(futures):
-                try:
-                    fetched = fut.result() or []
-                except Exception as e:
-                    print(f"[ERROR] Falha ao buscar feed {topic}: {e}")
+        # 1ª passada: filtros exatos (link / conteúdo) e MinHash só dos sobreviventes
+        batch_keys: Set[int] = set()
+        batch_digests: Set[bytes] = set()
+        survivors = []
+        for item, link, key in candidates:
+            # o mesmo link pode vir duas vezes no lote
+            if key in batch_keys or (claimed is not None and link not in claimed):
+                continue
+            # dedupe exato por conteúdo (barato) antes do MinHash/LSH
+            digest = _content_digest(item)
+            if digest in hashes or digest in batch_digests:
+                continue
+            batch_keys.add(key)
+            batch_digests.add(digest)
+            text = f"{item.get('title','')} {item.get('summary','')}".strip()
+            survivors.append((item, key, digest, self._build_minhash(text)))
+        if not survivors:
+            return fresh
+
+        # 2ª passada, sob o lock do tópico: outro update do mesmo tópico (/force-update
+        # durante o job agendado) não intercala com a decisão nem com as inserções em
+        # all_news/_neg_pub_ts (listas paralelas) e no LSH.
+        # Dedupe aproximado (título/summary parecidos) com as chaves de banda do lote
+        # inteiro de uma vez; itens do próprio lote ainda não estão no LSH e são comparados direto
+        with self._topic_locks[topic]:
+            hits = _lsh_hits(lsh, np.vstack([m.hashvalues for *_, m in survivors]))
+            for (item, key, digest, m), hit in zip(survivors, hits):
+                # seen/hashes de novo: podem ter mudado desde a 1ª passada (fora do lock)
+                if hit or key in seen or digest in hashes:
+                    continue
+                if any(m.jaccard(p) >= _LSH_THRESHOLD for p in pending):
                     continue
+                pending.append(m)
+                hashes.add(digest)
+                seen.add(key)
+                item["_pub_ts"] = ts = _published_ts(item.get("published"))
+                # bisect_right: empate em published mantém a ordem de chegada
+                idx = bisect.bisect_right(neg_ts, -ts)
+                neg_ts.insert(idx, -ts)
+                news.insert(idx, item)
+                fresh.append(item)
 
-                for item in fetched:
-                    link = item.get("link")
-                    if not link:
-                        continue
-                    # dedupe simples por link
-                    if link in self.seen_links[topic]:
-                        continue
-
-                    text = f"{item.get('title','')} {item.get('summary','')}".strip()
-                    m = self._build_minhash(text)
-
-                    # dedupe aproximado (título/summary parecidos)
-                    if self.lsh_index[topic].query(m):
-                        continue
-
-                    # seção crítica (id + índices)
-                    with self._lock:
-                        self.lsh_index[topic].insert(self._next_id, m)
-                        self.minhashes[topic][self._next_id] = m
-                        item["_id"] = self._next_id
-                        self._next_id += 1
-
-                    self.seen_links[topic].add(link)
-                    self.all_news[topic].append(item)
-                    fresh.append(item)
-
-        # Ordena por data de publicação (desc)
-        self.all_news[topic].sort(key=lambda x: x.get("published") or "", reverse=True)
-        fresh.sort(key=lambda x: x.get("published") or "", reverse=True)
+            if pending:
+                # inserção em lote (uma sessão para todas as bandas)
+                minhashes = self.minhashes[topic]
+                with lsh.insertion_session() as session:
+                    for item, m in zip(fresh, pending):
+                        item_id = next(self._id_counter)
+                        session.insert(item_id, m, check_duplication=False)
+                        minhashes[item_id] = m
+                        item["_id"] = item_id
+        return fresh
+
+    def _finalize_topic(self, topic: str, fresh: List[Dict], limit: int) -> List[Dict]:
+        # all_news já está ordenada; só os novos deste update são ordenados (desc)
+        fresh.sort(key=_newest_first)
         # Poda de memória
         self._prune_topic_memory(topic)
 
         self.last_fetched[topic] = fresh[:limit]
+        if self._redis is not None:
+            try:
+                self._redis.hset(_REDIS_LAST_FETCHED, topic, int(time.time()))
+            except Exception as e:
+                logger.warning("Redis hset falhou para '%s': %s", topic, e)
         return self.last_fetched[topic]
 
+    def update_topic(self, topic: str, limit: int = 10, cutoff: Optional[datetime] = None) -> List[Dict]:
+        feeds = self.feeds.get(topic, [])
+        if not feeds:
+            return []
+
+        fresh: List[Dict] = []
+
+        # Busca feeds em paralelo (melhor latência por tópico). Produtor/consumidor:
+        # as threads do pool só fazem I/O; o MinHash/LSH roda aqui, numa única thread
+        # consumidora por tópico, na ordem em que os feeds terminam (as_completed)
+        fetch_pool, _ = self._pools()
+        futures = [fetch_pool.submit(feed.fetch, cutoff) for feed in feeds]
+        for fut in as_completed(futures):
+            try:
+                fetched = fut.result() or []
+            except Exception as e:
+                logger.error("Falha ao buscar feed %s: %s", topic, e)
+                continue
+            fresh.extend(self._ingest(topic, fetched))
+
+        return self._finalize_topic(topic, fresh, limit)
+
     def update_all(self):
         topics = list(self.feeds.keys())
         if not topics:
             self.last_updated = time.time()
             return
 
+        # cutoff calculado uma vez por refresh e compartilhado por todos os feeds
+        cutoff = today_cutoff()
         # Atualiza vários tópicos em paralelo para diminuir o makespan total
-        with ThreadPoolExecutor(max_workers=min(len(topics), _MAX_TOPIC_WORKERS)) as ex:
-            futures = {ex.submit(self.update_topic, t): t for t in topics}
-            for fut in as_completed(futures):
-                t = futures[fut]
-                try:
-                    fut.result()
-                except Exception as e:
-                    print(f"[ERROR] update_topic falhou para '{t}': {e}")
+        _, topic_pool = self._pools()
+        futures = {topic_pool.submit(self.update_topic, t, cutoff=cutoff): t for t in topics}
+        for fut in as_completed(futures):
+            t = futures[fut]
+            try:
+                fut.result()
+            except Exception as e:
+                logger.error("update_topic falhou para '%s': %s", t, e)
+
+        self.last_updated = time.time()
+
+    @staticmethod
+    async def _fetch_feeds_async(feeds: List[BaseFeed], cutoff: Optional[datetime]) -> List:
+        """Fetch concorrente (asyncio.gather) de vários feeds; exceções voltam na lista."""
+        async with AsyncExitStack() as stack:
+            # um cliente por valor de `verify` (no httpx o verify é do cliente, não da request)
+            clients = {}
+            for verify in {getattr(f, "verify", True) for f in feeds}:
+                clients[verify] = await stack.enter_async_context(make_async_client(verify))
+            return await asyncio.gather(
+                *(f.fetch_async(clients[getattr(f, "verify", True)], cutoff) for f in feeds),
+                return_exceptions=True,
+            )
+
+    async def update_topic_async(self, topic: str, limit: int = 10, cutoff: Optional[datetime] = None) -> List[Dict]:
+        """Versão async de `update_topic`: os feeds do tópico são buscados no event loop, sem threads."""
+        feeds = self.feeds.get(topic, [])
+        if not feeds:
+            return []
+
+        results = await self._fetch_feeds_async(feeds, cutoff)
+        # tópico pode ter sido removido durante o fetch
+        if topic not in self.feeds:
+            return []
+        fresh: List[Dict] = []
+        for fetched in results:
+            if isinstance(fetched, Exception):
+                logger.error("Falha ao buscar feed %s: %s", topic, fetched)
+                continue
+            fresh.extend(self._ingest(topic, fetched or []))
+        return self._finalize_topic(topic, fresh, limit)
+
+    async def update_all_async(self, limit: int = 10):
+        """
+        Versão async de `update_all`: dispara os fetches de todos os feeds de todos
+        os tópicos de uma vez (httpx.AsyncClient compartilhado) e depois deduplica
+        por tópico. O tempo total fica ~ o do fetch mais lento, não a soma.
+        """
+        jobs = [(t, f) for t, feeds in list(self.feeds.items()) for f in feeds]
+        if not jobs:
+            self.last_updated = time.time()
+            return
+
+        cutoff = today_cutoff()
+        results = await self._fetch_feeds_async([f for _, f in jobs], cutoff)
+
+        fresh_by_topic: Dict[str, List[Dict]] = {}
+        for (t, _), fetched in zip(jobs, results):
+            fresh = fresh_by_topic.setdefault(t, [])
+            if isinstance(fetched, Exception):
+                logger.error("Falha ao buscar feed %s: %s", t, fetched)
+                continue
+            # tópico pode ter sido removido durante o fetch
+            if t in self.feeds:
+                fresh.extend(self._ingest(t, fetched or []))
+
+        for t, fresh in fresh_by_topic.items():
+            if t in self.feeds:
+                self._finalize_topic(t, fresh, limit)
 
         self.last_updated = time.time()
 
@@ -0,0 +1,35 @@
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+# ---------- Logging não bloqueante ----------
+# Os módulos só enfileiram registros (QueueHandler); uma thread do QueueListener
+# faz a escrita em stderr, fora dos jobs do scheduler e do event loop.
+_ROOT = "news"
+_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+_listener = None
+
+
+def _setup() -> None:
+    global _listener
+    root = logging.getLogger(_ROOT)
+    if _listener is not None:
+        return
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(logging.Formatter(_FORMAT))
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger filho de `news` (ex.: get_logger(__name__)) já ligado à fila."""
+    _setup()
+    return logging.getLogger(name if name.startswith(_ROOT) else f"{_ROOT}.{name}")
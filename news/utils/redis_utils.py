@@ -0,0 +1,32 @@
+import os
+from typing import Any, Optional
+from news.utils.log_utils import get_logger
+
+logger = get_logger(__name__)
+
+# ---------- Cliente Redis compartilhado (opcional) ----------
+# Só é usado quando REDIS_URL está definido; sem ele (ou sem o pacote `redis`)
+# os módulos seguem com o estado em memória do próprio processo.
+_CLIENT = None
+_RESOLVED = False
+
+
+def get_redis() -> Optional[Any]:
+    """Retorna um cliente Redis único por processo, ou None se não configurado."""
+    global _CLIENT, _RESOLVED
+    if _RESOLVED:
+        return _CLIENT
+    _RESOLVED = True
+
+    url = os.getenv("REDIS_URL")
+    if not url:
+        return None
+    try:
+        import redis  # local import para evitar dependência quando não usado
+
+        _CLIENT = redis.Redis.from_url(url, socket_timeout=2)
+        _CLIENT.ping()
+    except Exception as e:
+        logger.warning("Redis indisponível em %s: %s. Usando estado em memória.", url, e)
+        _CLIENT = None
+    return _CLIENT
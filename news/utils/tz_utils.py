@@ -1,18 +1,47 @@
 from datetime import datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
-from typing import Optional
+from typing import Iterable, List, Optional
+
+try:  # opcional: parser ISO 8601 em C; sem ele fica o datetime.fromisoformat
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:
+    _parse_iso = datetime.fromisoformat
 
 DEFAULT_TIMEZONE = "America/Sao_Paulo"
 
+
+@lru_cache(maxsize=32)
+def _get_zone(tz_name: str) -> ZoneInfo:
+    # ZoneInfo já tem cache próprio, mas aqui a chamada repetida vira um lookup de dict
+    return ZoneInfo(tz_name)
+
+
+def _fmt_local(dt: datetime) -> str:
+    # "%Y-%m-%d %H:%M" sem strftime (formato fixo, sem locale nem parse do formato)
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}"
+
 def utc_to_local(dt_utc: datetime, tz_name: str = DEFAULT_TIMEZONE) -> datetime:
     """Converte datetime UTC para timezone local."""
-    return dt_utc.astimezone(ZoneInfo(tz_name))
+    return dt_utc.astimezone(_get_zone(tz_name))
 
 def iso_to_local_str(iso_ts: str, tz_name: str = DEFAULT_TIMEZONE) -> Optional[str]:
     """Converte string ISO (em UTC) para string local formatada."""
     try:
-        dt_utc = datetime.fromisoformat(iso_ts)
+        dt_utc = _parse_iso(iso_ts)
         dt_local = utc_to_local(dt_utc, tz_name)
-        return dt_local.strftime("%Y-%m-%d %H:%M")
+        return _fmt_local(dt_local)
     except Exception:
         return None
+
+def iso_to_local_str_batch(iso_list: Iterable[str], tz_name: str = DEFAULT_TIMEZONE) -> List[Optional[str]]:
+    """Versão em lote de iso_to_local_str: resolve o fuso uma vez para a lista toda."""
+    zone = _get_zone(tz_name)
+    out: List[Optional[str]] = []
+    append = out.append
+    for iso_ts in iso_list:
+        try:
+            append(_fmt_local(_parse_iso(iso_ts).astimezone(zone)))
+        except Exception:
+            append(None)
+    return out